@@ -0,0 +1,44 @@
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from database_models import SimpleDatabase
+
+
+class AsyncDatabase:
+    """
+    Awaitable wrapper around SimpleDatabase for the async endpoints. Every
+    SimpleDatabase method is available as a coroutine of the same name and
+    arguments (``await adb.get_user(1)``) that runs on a dedicated pool of DB
+    threads, each with its own pooled connection, so a slow query holds up
+    only its own request instead of the event loop.
+    """
+
+    def __init__(self, db: SimpleDatabase, max_workers: int = 4):
+        self.sync_db = db
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run any blocking database work on the DB threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        # Only methods are wrapped; properties such as conn and cursor are
+        # per-thread and would open a connection on the event loop thread
+        if name.startswith("_") or not inspect.isfunction(getattr(SimpleDatabase, name, None)):
+            raise AttributeError(f"{type(self).__name__} has no async method {name!r}")
+        method = getattr(self.sync_db, name)
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await self.run(method, *args, **kwargs)
+
+        # Cache so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, List, Tuple
+
+from time_utils import SECONDS_PER_DAY, EPOCH_WEEKDAY
+
+# A user's availability is stored as one integer per week, one bit per
+# 15-minute quantum starting Monday 00:00 (bit 0) through Sunday 23:45 (bit 671).
+QUANTUM_SECONDS = 15 * 60
+QUANTA_PER_WEEK = 7 * SECONDS_PER_DAY // QUANTUM_SECONDS
+WEEK_SECONDS = 7 * SECONDS_PER_DAY
+WEEK_BYTES = QUANTA_PER_WEEK // 8
+
+
+def week_start(epoch: int) -> int:
+    """Epoch seconds of the Monday 00:00 on or before the given time"""
+    day = epoch // SECONDS_PER_DAY
+    return (day - (day + EPOCH_WEEKDAY) % 7) * SECONDS_PER_DAY
+
+
+def encode(intervals: Iterable[Tuple[int, int]], outward: bool = False) -> Dict[int, int]:
+    """
+    Encode (start, end) epoch intervals as {week_start: bits}.
+    Partial quanta are dropped (a quantum is set only if fully covered), or
+    kept with ``outward=True``, which suits busy time.
+    """
+    weeks: Dict[int, int] = {}
+    for start, end in intervals:
+        if outward:
+            first = start // QUANTUM_SECONDS
+            last = -(-end // QUANTUM_SECONDS)
+        else:
+            first = -(-start // QUANTUM_SECONDS)
+            last = end // QUANTUM_SECONDS
+        while first < last:
+            week = week_start(first * QUANTUM_SECONDS)
+            week_first = week // QUANTUM_SECONDS
+            low = first - week_first
+            high = min(last - week_first, QUANTA_PER_WEEK)
+            weeks[week] = weeks.get(week, 0) | (((1 << (high - low)) - 1) << low)
+            first = week_first + high
+    return weeks
+
+
+def union(a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    result = dict(a)
+    for week, bits in b.items():
+        result[week] = result.get(week, 0) | bits
+    return result
+
+
+def intersect(a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    result = {}
+    for week in a.keys() & b.keys():
+        bits = a[week] & b[week]
+        if bits:
+            result[week] = bits
+    return result
+
+
+def subtract(a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    result = {}
+    for week, bits in a.items():
+        bits &= ~b.get(week, 0)
+        if bits:
+            result[week] = bits
+    return result
+
+
+def runs(bits: int) -> List[Tuple[int, int]]:
+    """Runs of set bits as (first, last + 1) bit positions, in order"""
+    result = []
+    while bits:
+        low = (bits & -bits).bit_length() - 1
+        shifted = bits >> low
+        length = (shifted ^ (shifted + 1)).bit_length() - 1
+        result.append((low, low + length))
+        bits &= ~(((1 << length) - 1) << low)
+    return result
+
+
+def windows(weeks: Dict[int, int], min_duration_seconds: int = QUANTUM_SECONDS) -> List[Tuple[int, int]]:
+    """Decode into sorted (start, end) epoch windows at least min_duration_seconds long"""
+    merged: List[List[int]] = []
+    for week in sorted(weeks):
+        for low, high in runs(weeks[week]):
+            start = week + low * QUANTUM_SECONDS
+            end = week + high * QUANTUM_SECONDS
+            # Runs touching across a week boundary form one window
+            if merged and merged[-1][1] == start:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+    return [(start, end) for start, end in merged if end - start >= min_duration_seconds]
+
+
+def to_bytes(bits: int) -> bytes:
+    return bits.to_bytes(WEEK_BYTES, 'little')
+
+
+def from_bytes(data: bytes) -> int:
+    return int.from_bytes(data, 'little')
@@ -0,0 +1,294 @@
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+import availability_bitset
+from ml_module import SmartScheduler
+from database_models import SimpleDatabase
+from time_utils import to_epoch, from_epoch, SECONDS_PER_DAY
+
+
+class BatchScheduler:
+    """
+    Assigns many candidates across a pool of recruiters in one run.
+    Every feasible (candidate, recruiter, start time) triple is scored with the
+    SmartScheduler heuristics and model. The best few start times per
+    candidate/recruiter pair become edges of a sparse candidate x
+    (recruiter, start time) score matrix, and the assignment is solved as a
+    minimum-cost bipartite matching. Start times lie on the same
+    ``granularity_minutes`` grid as SmartScheduler.find_optimal_slots.
+
+    Recruiter capacity is part of the matching, so each solve is min-cost
+    under capacity. Columns of one recruiter may overlap in time; when a
+    solve books overlapping interviews, each recruiter keeps its best
+    non-overlapping ones and the rest are solved again without the clashing
+    columns. That repair is a heuristic, so the result is only guaranteed
+    min-cost when the first solve has no overlaps.
+    """
+
+    def __init__(self, scheduler: SmartScheduler, db: SimpleDatabase, slots_per_pair: int = 8,
+                 horizon_days: int = 14, granularity_minutes: int = 15):
+        self.scheduler = scheduler
+        self.db = db
+        self.slots_per_pair = slots_per_pair
+        self.granularity_minutes = granularity_minutes
+        # Recurring availability rules are expanded over this many days from now
+        self.horizon_days = horizon_days
+
+    def assign(self,
+               candidate_ids: List[int],
+               recruiter_ids: List[int],
+               duration_minutes: int = 60,
+               recruiter_capacity: Optional[int] = None,
+               commit: bool = True) -> Dict:
+        """
+        Assign candidates to recruiters and (optionally) store every interview
+        in a single transaction.
+        Returns the assignments, the candidates that could not be placed and the
+        time spent in each phase.
+        """
+        timings = {}
+        phase_start = time.perf_counter()
+
+        def end_phase(name):
+            nonlocal phase_start
+            now = time.perf_counter()
+            timings[f"{name}_ms"] = round((now - phase_start) * 1000, 3)
+            phase_start = now
+
+        # Phase 1: users, free time and recruiter histories
+        window_start = to_epoch(datetime.now())
+        window = (window_start, window_start + self.horizon_days * SECONDS_PER_DAY)
+        candidates = [user for user in (self.db.get_user(cid) for cid in dict.fromkeys(candidate_ids)) if user]
+        recruiters = [user for user in (self.db.get_user(rid) for rid in dict.fromkeys(recruiter_ids)) if user]
+        candidate_free = [self._free_bitsets(user['id'], window) for user in candidates]
+        recruiter_free = [self._free_bitsets(user['id'], window) for user in recruiters]
+        histories = [self.scheduler.get_history(user['id'], lambda uid=user['id']: self.db.get_user_interviews(uid))
+                     for user in recruiters]
+        end_phase('load')
+
+        # Phase 2: sparse score matrix
+        edges = self._build_edges(candidates, recruiters, candidate_free, recruiter_free,
+                                  histories, duration_minutes * 60)
+        end_phase('score')
+
+        # Phase 3: capacity-constrained matching
+        capacity = recruiter_capacity if recruiter_capacity is not None else len(candidates)
+        matches = self._solve(edges, len(candidates), len(recruiters), capacity, duration_minutes * 60)
+        end_phase('solve')
+
+        # Phase 4: one transaction for every interview
+        duration_seconds = duration_minutes * 60
+        assignments = []
+        for row, (recruiter_index, start, score) in sorted(matches.items()):
+            start_time = from_epoch(start).isoformat()
+            assignments.append({
+                'candidate_id': candidates[row]['id'],
+                'recruiter_id': recruiters[recruiter_index]['id'],
+                'start_time': start_time,
+                'end_time': from_epoch(start + duration_seconds).isoformat(),
+                'score': score,
+                'location': f"https://meet.company.com/{hash((start_time, recruiters[recruiter_index]['id'])) % 1000000:06d}"
+            })
+
+        if commit and assignments:
+            interview_ids = self.db.schedule_interviews_bulk([
+                (a['candidate_id'], a['recruiter_id'], a['start_time'], a['end_time'], a['location'])
+                for a in assignments
+            ])
+            for assignment, interview_id in zip(assignments, interview_ids):
+                assignment['interview_id'] = interview_id
+                self.scheduler.record_interview({**assignment, 'status': 'scheduled'})
+        end_phase('commit')
+
+        placed = {a['candidate_id'] for a in assignments}
+        return {
+            'assignments': assignments,
+            'unassigned': [cid for cid in dict.fromkeys(candidate_ids) if cid not in placed],
+            'timings': timings
+        }
+
+    def _free_bitsets(self, user_id: int, window: Tuple[int, int]) -> Dict[int, int]:
+        # Availability inside the window minus interviews that are already booked
+        available = self.db.get_user_window_bitsets(user_id, *window)
+        booked = availability_bitset.encode(
+            ((row['start_ts'], row['end_ts'])
+             for row in self.db.get_user_interviews(user_id, *window) if row['status'] != 'cancelled'),
+            outward=True
+        )
+        return availability_bitset.subtract(available, booked)
+
+    def _build_edges(self, candidates, recruiters, candidate_free, recruiter_free,
+                     histories, duration_seconds: int) -> Dict[str, np.ndarray]:
+        rows, recruiter_indexes, starts = [], [], []
+
+        for row in range(len(candidates)):
+            for recruiter_index, free in enumerate(recruiter_free):
+                common = availability_bitset.intersect(candidate_free[row], free)
+                pair_starts = _grid_starts(availability_bitset.windows(common, duration_seconds),
+                                           duration_seconds, self.granularity_minutes * 60)
+                if pair_starts.size == 0:
+                    continue
+                rows.append(np.full(pair_starts.size, row))
+                recruiter_indexes.append(np.full(pair_starts.size, recruiter_index))
+                starts.append(pair_starts)
+
+        if not starts:
+            empty = np.empty(0, dtype=np.int64)
+            return {'rows': empty, 'recruiters': empty, 'starts': empty, 'scores': np.empty(0)}
+
+        pair_sizes = np.array([pair_starts.size for pair_starts in starts])
+        rows = np.concatenate(rows)
+        recruiter_indexes = np.concatenate(recruiter_indexes)
+        starts = np.concatenate(starts)
+
+        # Same heuristic as SmartScheduler._heuristic_scores, computed for the
+        # whole batch: time-of-week score x candidate priority + recruiter history
+        priority_weights = np.array([self.scheduler._priority_weight(candidate) for candidate in candidates])
+        scores = self.scheduler._time_scores(starts) * priority_weights[rows]
+        hours, weekdays = self.scheduler._hours_and_weekdays(starts)
+        for recruiter_index, history in enumerate(histories):
+            selected = recruiter_indexes == recruiter_index
+            scores[selected] += history.bonuses(hours[selected], weekdays[selected])
+
+        # One model call for the whole batch; candidates share the default level
+        model = self.scheduler.model
+        if model is not None:
+            recruiter_ids = [recruiters[i]['id'] for i in recruiter_indexes]
+            scores = self.scheduler._blend_model_scores(scores, starts, recruiter_ids, {}, model)
+
+        # Keep only the best few start times of each candidate/recruiter pair,
+        # skipping any that overlaps a better one kept for the same pair, so
+        # the options left to the solver are distinct interviews
+        pairs = np.repeat(np.arange(pair_sizes.size), pair_sizes)
+        order = np.lexsort((-scores, pairs)).tolist()
+        start_values = starts.tolist()
+        keep, position = [], 0
+        for pair_size in pair_sizes.tolist():
+            kept_starts = []
+            for i in order[position:position + pair_size]:
+                if all(abs(start_values[i] - other) >= duration_seconds for other in kept_starts):
+                    kept_starts.append(start_values[i])
+                    keep.append(i)
+                    if len(kept_starts) == self.slots_per_pair:
+                        break
+            position += pair_size
+        keep = np.sort(np.array(keep, dtype=np.int64))
+        return {'rows': rows[keep], 'recruiters': recruiter_indexes[keep],
+                'starts': starts[keep], 'scores': scores[keep]}
+
+    def _solve(self, edges: Dict[str, np.ndarray], candidate_count: int, recruiter_count: int,
+               capacity: int, duration_seconds: int) -> Dict[int, Tuple[int, int, float]]:
+        # Columns are distinct (recruiter, start) pairs
+        column_keys, columns = np.unique(np.stack((edges['recruiters'], edges['starts'])), axis=1,
+                                         return_inverse=True)
+        columns = columns.ravel()
+        column_recruiters, column_starts = column_keys
+
+        matches = {}
+        row_open = np.ones(candidate_count, dtype=bool)
+        column_open = np.ones(column_keys.shape[1], dtype=bool)
+        remaining = np.full(recruiter_count, capacity)
+        column_open &= remaining[column_recruiters] > 0
+
+        # Solve under capacity, then let each recruiter keep its best matches
+        # that do not overlap a better one. Kept matches are final and close
+        # every column they clash with; the dropped rows are solved again.
+        # Each round keeps at least one match, so the loop ends.
+        while row_open.any():
+            solution = self._match(edges, columns, column_recruiters, row_open, column_open, remaining)
+            if not solution:
+                break
+
+            by_recruiter = {}
+            for row, edge in solution.items():
+                by_recruiter.setdefault(column_recruiters[columns[edge]], []).append((row, edge))
+
+            overlapping = False
+            for recruiter_index, recruiter_matches in by_recruiter.items():
+                kept = []
+                for row, edge in sorted(recruiter_matches, key=lambda item: -edges['scores'][item[1]]):
+                    start = edges['starts'][edge]
+                    if any(abs(start - other) < duration_seconds for _, other in kept):
+                        overlapping = True
+                        continue
+                    kept.append((row, start))
+                    matches[row] = (int(recruiter_index), int(start), float(edges['scores'][edge]))
+                    row_open[row] = False
+                    column_open[(column_recruiters == recruiter_index)
+                                & (np.abs(column_starts - start) < duration_seconds)] = False
+                remaining[recruiter_index] -= len(kept)
+                if remaining[recruiter_index] <= 0:
+                    column_open[column_recruiters == recruiter_index] = False
+
+            if not overlapping:
+                break
+
+        return matches
+
+    @staticmethod
+    def _match(edges, columns, column_recruiters, row_open, column_open, remaining) -> Dict[int, int]:
+        # Minimum-cost matching over the open rows and columns. Every row also
+        # gets a private "unassigned" column so a full matching always exists;
+        # costs are shifted to stay positive, which leaves the optimum unchanged
+        # because every row is matched exactly once.
+        # A recruiter with more open columns than remaining capacity gets one
+        # blocker row per surplus column. Blockers can only take that
+        # recruiter's columns, so at most its remaining capacity is left for
+        # candidates, and they cost the same as leaving a row unassigned.
+        usable = np.flatnonzero(row_open[edges['rows']] & column_open[columns])
+        if usable.size == 0:
+            return {}
+
+        open_rows = np.flatnonzero(row_open)
+        row_position = np.full(row_open.size, -1)
+        row_position[open_rows] = np.arange(open_rows.size)
+        used_columns, column_position = np.unique(columns[usable], return_inverse=True)
+        column_position = column_position.ravel()
+
+        scores = edges['scores'][usable]
+        offset = scores.max() + 1.0
+        cell_rows = [row_position[edges['rows'][usable]], np.arange(open_rows.size)]
+        cell_columns = [column_position, used_columns.size + np.arange(open_rows.size)]
+        cell_costs = [offset - scores, np.full(open_rows.size, offset)]
+
+        blocker_count = 0
+        used_recruiters = column_recruiters[used_columns]
+        for recruiter_index in np.unique(used_recruiters):
+            recruiter_columns = np.flatnonzero(used_recruiters == recruiter_index)
+            recruiter_rows = np.unique(edges['rows'][usable][used_recruiters[column_position] == recruiter_index])
+            surplus = recruiter_columns.size - remaining[recruiter_index]
+            if surplus <= 0 or recruiter_rows.size <= remaining[recruiter_index]:
+                continue
+            blockers = open_rows.size + blocker_count + np.arange(surplus)
+            cell_rows.append(np.repeat(blockers, recruiter_columns.size))
+            cell_columns.append(np.tile(recruiter_columns, surplus))
+            cell_costs.append(np.full(surplus * recruiter_columns.size, offset))
+            blocker_count += surplus
+
+        matrix = csr_matrix(
+            (np.concatenate(cell_costs), (np.concatenate(cell_rows), np.concatenate(cell_columns))),
+            shape=(open_rows.size + blocker_count, used_columns.size + open_rows.size)
+        )
+        matched_rows, matched_columns = min_weight_full_bipartite_matching(matrix)
+
+        # Map matched (row, column) cells of real candidates back to edges
+        width = matrix.shape[1]
+        edge_cells = row_position[edges['rows'][usable]] * width + column_position
+        cell_order = np.argsort(edge_cells)
+        real = (matched_rows < open_rows.size) & (matched_columns < used_columns.size)
+        matched_cells = matched_rows[real] * width + matched_columns[real]
+        matched_edges = usable[cell_order[np.searchsorted(edge_cells, matched_cells, sorter=cell_order)]]
+        return {int(open_rows[row]): int(edge) for row, edge in zip(matched_rows[real], matched_edges)}
+
+
+def _grid_starts(windows: List[Tuple[int, int]], duration_seconds: int, step_seconds: int) -> np.ndarray:
+    # Start times every step_seconds that leave room for the whole interview
+    starts = [np.arange(-(-start // step_seconds) * step_seconds, end - duration_seconds + 1,
+                        step_seconds, dtype=np.int64)
+              for start, end in windows]
+    return np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
@@ -0,0 +1,173 @@
+"""
+Query latency benchmark for SimpleDatabase at scale.
+
+Builds a database with a large synthetic availability table (1M rows by
+default), times the hot per-user queries on the unindexed baseline schema,
+then applies the migrations and times them again:
+
+    python benchmark_database.py --rows 1000000 --output db_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from database_models import SimpleDatabase, MIGRATIONS
+
+# Queries as they ran before the migrations
+BASELINE_QUERIES = {
+    "get_user_availability": ("SELECT * FROM availability WHERE user_id = ?", 1),
+    "clear_user_availability": ("DELETE FROM availability WHERE user_id = ?", 1),
+    "get_user_interviews": (
+        "SELECT * FROM interviews WHERE candidate_id = ? OR recruiter_id = ? ORDER BY start_time", 2
+    ),
+}
+
+# The same operations after the migrations
+MIGRATED_QUERIES = {
+    "get_user_availability": BASELINE_QUERIES["get_user_availability"],
+    "clear_user_availability": BASELINE_QUERIES["clear_user_availability"],
+    "get_user_interviews": (
+        """SELECT * FROM interviews WHERE candidate_id = ?
+           UNION ALL
+           SELECT * FROM interviews WHERE recruiter_id = ? AND candidate_id != ?
+           ORDER BY start_ts""", 3
+    ),
+}
+
+
+def build_database(path: str, rows: int, users: int, interviews: int, seed: int):
+    """Create the schema without indexes and fill it with synthetic rows"""
+    if os.path.exists(path):
+        os.remove(path)
+    SimpleDatabase(path).close()
+
+    rng = random.Random(seed)
+    start_date = datetime(2025, 1, 6)
+    conn = sqlite3.connect(path)
+    # Back to the unindexed baseline so the first pass measures the old schema
+    for _, _, statements in MIGRATIONS:
+        for statement in statements:
+            if isinstance(statement, str) and statement.startswith("CREATE INDEX"):
+                index_name = statement.split("IF NOT EXISTS ")[1].split()[0]
+                conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    conn.execute("PRAGMA user_version = 0")
+
+    conn.executemany(
+        "INSERT INTO users (id, name, email, user_type) VALUES (?, ?, ?, ?)",
+        ((user_id, f"User {user_id}", f"user{user_id}@example.com",
+          "recruiter" if user_id % 10 == 0 else "candidate") for user_id in range(1, users + 1))
+    )
+
+    def availability_rows():
+        for _ in range(rows):
+            start = start_date + timedelta(days=rng.randint(0, 180), minutes=30 * rng.randint(16, 35))
+            yield (rng.randint(1, users), start.isoformat(), (start + timedelta(minutes=30)).isoformat(),
+                   "synthetic")
+
+    conn.executemany(
+        "INSERT INTO availability (user_id, start_time, end_time, source_text) VALUES (?, ?, ?, ?)",
+        availability_rows()
+    )
+
+    def interview_rows():
+        for _ in range(interviews):
+            start = start_date + timedelta(days=rng.randint(0, 180), hours=rng.randint(9, 16))
+            yield (rng.randint(1, users), rng.randrange(10, users + 1, 10), start.isoformat(),
+                   (start + timedelta(hours=1)).isoformat())
+
+    conn.executemany(
+        "INSERT INTO interviews (candidate_id, recruiter_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+        interview_rows()
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params_per_call: int, user_ids: List[int],
+               repeat: int, rollback: bool) -> Dict:
+    timings = []
+    for _ in range(repeat):
+        for user_id in user_ids:
+            start = time.perf_counter()
+            conn.execute(sql, (user_id,) * params_per_call).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+            if rollback:
+                conn.rollback()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(sorted(timings)[int(len(timings) * 0.95) - 1], 3),
+        "max_ms": round(max(timings), 3),
+        "calls": len(timings),
+        "plan": [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (0,) * params_per_call)]
+    }
+
+
+def run_pass(path: str, queries: Dict, user_ids: List[int], repeat: int) -> Dict:
+    conn = sqlite3.connect(path)
+    results = {}
+    for name, (sql, params_per_call) in queries.items():
+        results[name] = time_query(conn, sql, params_per_call, user_ids, repeat,
+                                   rollback=sql.startswith("DELETE"))
+    conn.close()
+    return results
+
+
+def run_benchmark(args) -> Dict:
+    started = time.perf_counter()
+    build_database(args.db_path, args.rows, args.users, args.interviews, args.seed)
+    build_seconds = time.perf_counter() - started
+
+    user_ids = random.Random(args.seed).sample(range(1, args.users + 1), args.sample_users)
+    before = run_pass(args.db_path, BASELINE_QUERIES, user_ids, args.repeat)
+
+    started = time.perf_counter()
+    db = SimpleDatabase(args.db_path)
+    schema_version = db.schema_version()
+    db.close()
+    migrate_seconds = time.perf_counter() - started
+
+    after = run_pass(args.db_path, MIGRATED_QUERIES, user_ids, args.repeat)
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "environment": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version},
+        "config": vars(args),
+        "build_seconds": round(build_seconds, 3),
+        "migrate_seconds": round(migrate_seconds, 3),
+        "schema_version": schema_version,
+        "before": before,
+        "after": after,
+        "speedup": {name: round(before[name]["median_ms"] / max(after[name]["median_ms"], 1e-6), 1)
+                    for name in before}
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SimpleDatabase query latency")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Availability rows")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--interviews", type=int, default=200_000)
+    parser.add_argument("--sample-users", type=int, default=50, help="Users queried per pass")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-path", default="benchmark_scheduler.db")
+    parser.add_argument("--output", default="benchmark_database_results.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_benchmark(args)
+    for name, speedup in report["speedup"].items():
+        print(f"{name}: {report['before'][name]['median_ms']} ms -> "
+              f"{report['after'][name]['median_ms']} ms ({speedup}x)")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
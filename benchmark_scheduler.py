@@ -0,0 +1,249 @@
+"""
+Benchmark suite for SmartScheduler.
+
+Generates reproducible synthetic populations of candidates and recruiters
+and times the main scheduling steps with and without a trained model:
+
+    python benchmark_scheduler.py --candidates 20 100 --recruiters 5 20 --output results.json
+
+Results are written as JSON so runs can be compared for regressions.
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import numpy as np
+import sklearn
+
+from ml_module import RecruiterHistory, SmartScheduler
+from slot_model import Slot
+from time_utils import to_epoch
+
+PRIORITIES = ("high", "medium", "low")
+CANDIDATE_LEVELS = ("junior", "mid", "senior")
+SLOT_MINUTES = 30
+
+
+class SyntheticPopulation:
+    """
+    Candidates and recruiters with fragmented availability and recruiter
+    interview histories, generated from a seed. Availability is a list of
+    30-minute fragments, the shape the NLP parser produces.
+    """
+
+    def __init__(self,
+                 n_candidates: int,
+                 n_recruiters: int,
+                 days: int = 10,
+                 fragment_density: float = 0.5,
+                 history_length: int = 50,
+                 seed: int = 42,
+                 start_date: datetime = datetime(2025, 3, 10)):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.fragment_density = fragment_density
+        self.start_date = start_date
+
+        self.candidates = [{"id": i, "priority": self.rng.choice(PRIORITIES)}
+                           for i in range(1, n_candidates + 1)]
+        self.recruiters = [{"id": n_candidates + i} for i in range(1, n_recruiters + 1)]
+
+        self.availability = {user["id"]: self._availability(user["id"])
+                             for user in self.candidates + self.recruiters}
+        self.histories = {recruiter["id"]: self._history(recruiter["id"], history_length)
+                          for recruiter in self.recruiters}
+
+    def _workdays(self) -> List[datetime]:
+        days = (self.start_date + timedelta(days=offset) for offset in range(self.days))
+        return [day for day in days if day.weekday() < 5]
+
+    def _availability(self, user_id: int) -> List[Slot]:
+        slots = []
+        for day in self._workdays():
+            for hour, minute in itertools.product(range(8, 18), (0, 30)):
+                if self.rng.random() < self.fragment_density:
+                    start = to_epoch(day.replace(hour=hour, minute=minute))
+                    slots.append(Slot(start, start + SLOT_MINUTES * 60, user_id))
+        return slots
+
+    def _history(self, recruiter_id: int, length: int) -> List[Dict]:
+        history = []
+        for _ in range(length):
+            day = self.start_date - timedelta(days=self.rng.randint(1, 90))
+            start = day.replace(hour=self.rng.randint(8, 17), minute=self.rng.choice((0, 30)))
+            history.append({
+                "start_time": start.isoformat(),
+                "recruiter_id": recruiter_id,
+                "status": "completed" if self.rng.random() < 0.7 else "cancelled"
+            })
+        return history
+
+    def training_data(self, n_samples: int = 500) -> List[Dict]:
+        """Outcome records in the format SmartScheduler.train_model expects"""
+        data = []
+        for _ in range(n_samples):
+            day = self.start_date - timedelta(days=self.rng.randint(1, 180))
+            hour = self.rng.randint(8, 17)
+            # Mornings succeed more often, so the model has something to learn
+            success_rate = 0.8 if hour < 12 else 0.5
+            data.append({
+                "slot_start": day.replace(hour=hour).isoformat(),
+                "interviewer_id": self.rng.choice(self.recruiters)["id"],
+                "candidate_level": self.rng.choice(CANDIDATE_LEVELS),
+                "completed_successfully": self.rng.random() < success_rate
+            })
+        return data
+
+    def pairs(self, limit: int) -> List[tuple]:
+        pairs = list(itertools.product(self.candidates, self.recruiters))
+        self.rng.shuffle(pairs)
+        return pairs[:limit]
+
+
+def time_call(func: Callable, repeat: int) -> Dict:
+    """Run func ``repeat`` times and summarize the wall-clock timings"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "calls": calls
+    }
+
+
+def run_scenario(population: SyntheticPopulation,
+                 with_model: bool,
+                 max_pairs: int,
+                 max_slot_calls: int,
+                 repeat: int) -> Dict:
+    scheduler = SmartScheduler()
+    if with_model:
+        scheduler.train_model(population.training_data())
+
+    pairs = population.pairs(max_pairs)
+    availability = population.availability
+    # Histograms are built once per recruiter, as the scheduler's history cache does
+    histories = {user_id: RecruiterHistory.from_schedules(schedules)
+                 for user_id, schedules in population.histories.items()}
+
+    # Inputs for the per-slot steps come from the real overlaps
+    overlaps = [(candidate, recruiter, scheduler._find_overlapping_slots(availability[candidate["id"]],
+                                                                         availability[recruiter["id"]]))
+                for candidate, recruiter in pairs]
+    slot_count = sum(len(slots) for _, _, slots in overlaps)
+    # Single-slot helpers are timed on a sample; one model call per slot is slow
+    sampled_slots = list(itertools.islice(((candidate, recruiter, slot) for candidate, recruiter, slots in overlaps
+                                           for slot in slots), max_slot_calls))
+
+    def find_overlaps():
+        for candidate, recruiter in pairs:
+            scheduler._find_overlapping_slots(availability[candidate["id"]], availability[recruiter["id"]])
+        return len(pairs)
+
+    def score_slots():
+        for candidate, recruiter, slots in overlaps:
+            scheduler._score_slots(slots, candidate, histories[recruiter["id"]])
+        return len(overlaps)
+
+    def predict_slot_score():
+        for candidate, _, slot in sampled_slots:
+            scheduler._predict_slot_score(slot, candidate)
+        return len(sampled_slots)
+
+    def historical_bonus():
+        for _, recruiter, slot in sampled_slots:
+            scheduler._calculate_historical_bonus(slot, histories[recruiter["id"]])
+        return len(sampled_slots)
+
+    def find_optimal_slots():
+        for candidate, recruiter in pairs:
+            scheduler.find_optimal_slots(availability[candidate["id"]], availability[recruiter["id"]],
+                                         candidate, history=histories[recruiter["id"]])
+        return len(pairs)
+
+    timings = {
+        "_find_overlapping_slots": time_call(find_overlaps, repeat),
+        "_score_slots": time_call(score_slots, repeat),
+        "_calculate_historical_bonus": time_call(historical_bonus, repeat),
+        "find_optimal_slots": time_call(find_optimal_slots, repeat),
+    }
+    # Without a model this returns a constant, so only time it when there is one
+    if with_model:
+        timings["_predict_slot_score"] = time_call(predict_slot_score, repeat)
+
+    return {
+        "model": with_model,
+        "pairs": len(pairs),
+        "overlapping_slots": slot_count,
+        "timings": timings
+    }
+
+
+def run_benchmarks(args) -> Dict:
+    results = []
+    grid = itertools.product(args.candidates, args.recruiters, args.density, args.history)
+    for n_candidates, n_recruiters, density, history_length in grid:
+        population = SyntheticPopulation(n_candidates, n_recruiters, days=args.days,
+                                         fragment_density=density, history_length=history_length,
+                                         seed=args.seed)
+        for with_model in (False, True):
+            result = run_scenario(population, with_model, args.max_pairs, args.max_slot_calls, args.repeat)
+            result.update({
+                "candidates": n_candidates,
+                "recruiters": n_recruiters,
+                "fragment_density": density,
+                "history_length": history_length,
+            })
+            results.append(result)
+            print(f"candidates={n_candidates} recruiters={n_recruiters} density={density} "
+                  f"history={history_length} model={with_model}: "
+                  f"find_optimal_slots {result['timings']['find_optimal_slots']['median_ms']} ms")
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+        },
+        "config": vars(args),
+        "results": results
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SmartScheduler pipeline")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--recruiters", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--density", type=float, nargs="+", default=[0.3, 0.7],
+                        help="Probability that each 30-minute business-hours fragment is free")
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 200],
+                        help="Past interviews per recruiter")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--max-pairs", type=int, default=200,
+                        help="Candidate/recruiter pairs timed per scenario")
+    parser.add_argument("--max-slot-calls", type=int, default=200,
+                        help="Slots timed through the single-slot helpers per scenario")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_benchmarks(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
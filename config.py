@@ -15,6 +15,51 @@ CALENDAR_CONFIG = {
     'SCOPES': ['https://www.googleapis.com/auth/calendar']
 }
 
+# Database Configuration
+DATABASE_CONFIG = {
+    'PATH': 'scheduler.db',
+    'JOURNAL_MODE': 'WAL',  # Readers do not block on the writer
+    'SYNCHRONOUS': 'NORMAL',  # Durable at checkpoints; safe with WAL
+    'BUSY_TIMEOUT_MS': 5000,  # How long a writer waits for the lock
+    'CACHED_STATEMENTS': 256,  # Prepared statements kept per connection
+    'ASYNC_WORKERS': 4,  # DB threads serving the async endpoints
+}
+
+# Availability Parser Configuration
+NLP_CONFIG = {
+    'SPACY_MODEL': 'en_core_web_sm',
+    'SPACY_FALLBACK': True,  # Use spaCy NER when no known date pattern matches
+    'PARSE_CACHE_SIZE': 1024,
+    'PARSE_CACHE_TTL_SECONDS': 3600,
+    'PARSE_CACHE_DB': None,  # Path to a SQLite file to share parses across workers
+    'WORKERS': None,  # Parser processes for batch parsing (None = one per CPU)
+    'WORKER_CHUNK_SIZE': 32,  # Texts sent to a worker per task
+    'PIPE_BATCH_SIZE': 64,  # nlp.pipe batch size inside a worker
+    'MAX_PENDING_PARSES': 64,  # Parse requests beyond this many queued tasks get a 429
+}
+
+# Scheduler Configuration
+SCHEDULER_CONFIG = {
+    'START_GRANULARITY_MINUTES': 15,  # Interview start times are generated on this grid
+    'SEARCH_HORIZON_DAYS': 14,  # Recurring availability is expanded this far ahead
+    'HISTORY_TTL_SECONDS': 60,  # Cached interview histories are reloaded after this long
+}
+
+# Scheduler Model Configuration
+MODEL_CONFIG = {
+    'ARTIFACT_DIR': 'models',
+    'KEEP_VERSIONS': 5,  # Older model files are deleted after each save
+    'RELOAD_INTERVAL_SECONDS': 60,  # How often workers look for a newer model
+    # Retraining runs once, not per API worker: either as its own process
+    # (python retraining.py --loop) or, when enabled here, in the one API
+    # worker holding RETRAIN_LOCK_PATH
+    'RETRAIN_ENABLED': False,
+    'RETRAIN_LOCK_PATH': os.path.join('models', 'retraining.lock'),
+    'RETRAIN_INTERVAL_SECONDS': 3600,
+    'RETRAIN_MIN_NEW_OUTCOMES': 50,  # Retrain early after this many completed/cancelled interviews
+    'RETRAIN_CHUNK_SIZE': 5000,
+}
+
 def load_env_vars():
     """Load environment variables for email and calendar"""
     os.environ['EMAIL_SMTP_SERVER'] = EMAIL_CONFIG['SMTP_SERVER']
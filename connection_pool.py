@@ -0,0 +1,99 @@
+import itertools
+import sqlite3
+import threading
+from typing import Dict
+
+# Distinguishes the names of separate in-memory databases
+_memory_ids = itertools.count(1)
+
+
+class ConnectionPool:
+    """
+    One SQLite connection per thread, all opened on the same database. Each
+    FastAPI worker thread and background task gets its own connection and
+    cursor, so lastrowid and fetchall never race, and in WAL mode readers run
+    alongside a writer instead of queueing behind it. Every connection keeps
+    its own prepared-statement cache of ``cached_statements`` entries.
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 journal_mode: str = "WAL",
+                 synchronous: str = "NORMAL",
+                 busy_timeout_ms: int = 5000,
+                 cached_statements: int = 256):
+        self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+        # ":memory:" would give every thread a separate empty database, so
+        # use a named in-memory database on the memdb VFS (SQLite 3.36+), which
+        # unlike shared cache honours the busy timeout, and hold one connection
+        # open to keep it alive while the pool exists
+        self._uri = None
+        self._anchor = None
+        if db_path == ":memory:":
+            self._uri = f"file:/scheduler_memory_{next(_memory_ids)}?vfs=memdb"
+            self._anchor = self._open()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.cursor = conn.cursor()
+            with self._lock:
+                self._prune()
+                self._connections[threading.get_ident()] = conn
+        return conn
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """The calling thread's cursor"""
+        self.connection
+        return self._local.cursor
+
+    def _open(self) -> sqlite3.Connection:
+        if self._uri:
+            conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False,
+                                   timeout=self.busy_timeout_ms / 1000,
+                                   cached_statements=self.cached_statements)
+        else:
+            # check_same_thread=False only so close() can run from another thread;
+            # each connection is otherwise used by the thread that opened it
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   timeout=self.busy_timeout_ms / 1000,
+                                   cached_statements=self.cached_statements)
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        return conn
+
+    def _prune(self):
+        """Close connections of threads that have exited (caller holds the lock)"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    def close(self):
+        """Close every connection in the pool"""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            if self._anchor is not None:
+                self._anchor.close()
+                self._anchor = None
+        self._local = threading.local()
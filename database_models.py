@@ -4,18 +4,121 @@ import json
 import sqlite3
 from typing import List, Dict, Any
 
+import availability_bitset
+from connection_pool import ConnectionPool
+from recurrence import RecurrenceRule, expand_rules
+from slot_model import Slot
+from time_utils import to_epoch, from_epoch
+
+
+def _add_column(table: str, column: str, definition: str):
+    """Migration step adding a column unless the table already has it"""
+    def add(db):
+        db.cursor.execute(f"PRAGMA table_info({table})")
+        if column not in {row['name'] for row in db.cursor.fetchall()}:
+            db.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return add
+
+
+def _backfill_epoch_columns(db):
+    """Fill start_ts/end_ts of existing rows from their TEXT times"""
+    for table in ("availability", "interviews"):
+        db.cursor.execute(f"SELECT id, start_time, end_time FROM {table} WHERE start_ts IS NULL")
+        updates = []
+        for row in db.cursor.fetchall():
+            try:
+                updates.append((to_epoch(row['start_time']), to_epoch(row['end_time']), row['id']))
+            except (TypeError, ValueError):
+                continue  # Left NULL, so the row never matches a window
+        db.cursor.executemany(f"UPDATE {table} SET start_ts = ?, end_ts = ? WHERE id = ?", updates)
+
+
+def _backfill_availability_bitsets(db):
+    """Encode the bitsets of every user with availability rows"""
+    db.cursor.execute("SELECT DISTINCT user_id FROM availability")
+    for row in db.cursor.fetchall():
+        db._rebuild_availability_bitsets(row['user_id'])
+
+
+def _convert_offset_epochs(db):
+    """Recompute start_ts/end_ts of rows whose TEXT times carry a UTC offset"""
+    for table in ("availability", "interviews"):
+        # Rows with start_ts set were parsed by the backfill, so they parse here too
+        db.cursor.execute(f"SELECT * FROM {table} WHERE start_ts IS NOT NULL")
+        rows = [row for row in db.cursor.fetchall()
+                if datetime.fromisoformat(row['start_time']).tzinfo is not None
+                or datetime.fromisoformat(row['end_time']).tzinfo is not None]
+        db.cursor.executemany(
+            f"UPDATE {table} SET start_ts = ?, end_ts = ? WHERE id = ?",
+            [(to_epoch(row['start_time']), to_epoch(row['end_time']), row['id']) for row in rows]
+        )
+        if table == "availability":
+            for user_id in {row['user_id'] for row in rows}:
+                db._rebuild_availability_bitsets(user_id)
+
+
+# Schema migrations, applied in order on top of the tables created by
+# _create_tables. PRAGMA user_version records the last one applied. A step
+# is SQL or a callable taking the SimpleDatabase.
+MIGRATIONS = [
+    (1, "Index lookups by user and start time", [
+        "CREATE INDEX IF NOT EXISTS idx_availability_user_start ON availability (user_id, start_time, end_time)",
+        "CREATE INDEX IF NOT EXISTS idx_availability_rules_user ON availability_rules (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_interviews_candidate_start ON interviews (candidate_id, start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_interviews_recruiter_start ON interviews (recruiter_id, start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_users_type ON users (user_type)",
+    ]),
+    (2, "Integer epoch time columns for range queries", [
+        _add_column("availability", "start_ts", "INTEGER"),
+        _add_column("availability", "end_ts", "INTEGER"),
+        _add_column("interviews", "start_ts", "INTEGER"),
+        _add_column("interviews", "end_ts", "INTEGER"),
+        _backfill_epoch_columns,
+        "CREATE INDEX IF NOT EXISTS idx_availability_user_end ON availability (user_id, end_ts, start_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_interviews_candidate_end ON interviews (candidate_id, end_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_interviews_recruiter_end ON interviews (recruiter_id, end_ts)",
+    ]),
+    (3, "Weekly availability bitsets", [
+        # One row per user and week, see availability_bitset
+        """CREATE TABLE IF NOT EXISTS availability_bitsets (
+               user_id INTEGER NOT NULL,
+               week_start INTEGER NOT NULL,  -- Epoch seconds of Monday 00:00
+               bits BLOB NOT NULL,  -- One bit per 15-minute quantum of the week
+               PRIMARY KEY (user_id, week_start),
+               FOREIGN KEY (user_id) REFERENCES users (id)
+           )""",
+        _backfill_availability_bitsets,
+    ]),
+    # Epoch columns hold naive wall-clock times (see time_utils); only times
+    # written with an offset are converted, to UTC
+    (4, "Convert epoch columns of times with a UTC offset", [
+        _convert_offset_epochs,
+    ]),
+]
+
+
 class SimpleDatabase:
     """
     A simple database implementation using SQLite for the scheduling bot.
     Focuses only on essential tables needed for demonstration.
     """
     
-    def __init__(self, db_path="scheduler.db"):
-        """Initialize database connection"""
-        self.conn = sqlite3.connect(db_path,check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        self.cursor = self.conn.cursor()
+    def __init__(self, db_path="scheduler.db", **pool_options):
+        """Initialize the connection pool (options are passed to ConnectionPool)"""
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, **pool_options)
         self._create_tables()
+        self._migrate()
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection"""
+        return self.pool.connection
+    
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """The calling thread's cursor"""
+        return self.pool.cursor
     
     def _create_tables(self):
         """Create the minimal tables needed for the scheduler"""
@@ -39,6 +142,23 @@ class SimpleDatabase:
             start_time TIMESTAMP NOT NULL,
             end_time TIMESTAMP NOT NULL,
             source_text TEXT,  -- Original text from NLP parsing
+            start_ts INTEGER,  -- start_time/end_time as epoch seconds (see time_utils)
+            end_ts INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''')
+        
+        # Create availability rules table (recurring availability, see recurrence)
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS availability_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            weekdays TEXT NOT NULL,  -- Comma-separated weekday numbers, Monday = 0
+            start_minute INTEGER NOT NULL,  -- Minutes after midnight
+            end_minute INTEGER NOT NULL,
+            valid_from INTEGER,  -- Epoch seconds, NULL for no bound
+            valid_until INTEGER,
+            source_text TEXT,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
         ''')
@@ -54,6 +174,8 @@ class SimpleDatabase:
             status TEXT DEFAULT 'scheduled',  -- scheduled, completed, cancelled
             location TEXT,  -- URL or physical location
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            start_ts INTEGER,  -- start_time/end_time as epoch seconds (see time_utils)
+            end_ts INTEGER,
             FOREIGN KEY (candidate_id) REFERENCES users (id),
             FOREIGN KEY (recruiter_id) REFERENCES users (id)
         )
@@ -61,6 +183,29 @@ class SimpleDatabase:
         
         self.conn.commit()
     
+    def _migrate(self):
+        """Apply the migrations newer than the database's user_version"""
+        self.cursor.execute("PRAGMA user_version")
+        current_version = self.cursor.fetchone()[0]
+        for version, description, statements in MIGRATIONS:
+            if version <= current_version:
+                continue
+            with self.conn:
+                # Explicit BEGIN so DDL is rolled back too if a statement fails
+                self.cursor.execute("BEGIN")
+                for statement in statements:
+                    if callable(statement):
+                        statement(self)
+                    else:
+                        self.cursor.execute(statement)
+                # PRAGMA does not take parameters; version is an int from MIGRATIONS
+                self.cursor.execute(f"PRAGMA user_version = {int(version)}")
+    
+    def schema_version(self) -> int:
+        """The last migration applied to this database"""
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+    
     # User operations
     def add_user(self, name: str, email: str, user_type: str, priority: str = 'medium') -> int:
         """Add a new user and return their ID"""
@@ -90,49 +235,262 @@ class SimpleDatabase:
     # Availability operations
     def add_availability(self, user_id: int, start_time: str, end_time: str, source_text: str = None) -> int:
         """Add availability for a user"""
+        start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
         self.cursor.execute(
-            "INSERT INTO availability (user_id, start_time, end_time, source_text) VALUES (?, ?, ?, ?)",
-            (user_id, start_time, end_time, source_text)
+            """INSERT INTO availability (user_id, start_time, end_time, source_text, start_ts, end_ts) 
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (user_id, start_time, end_time, source_text, start_ts, end_ts)
         )
+        availability_id = self.cursor.lastrowid
+        self._merge_availability_bitsets(user_id, availability_bitset.encode([(start_ts, end_ts)]))
         self.conn.commit()
-        return self.cursor.lastrowid
+        return availability_id
     
-    def get_user_availability(self, user_id: int) -> List[Dict]:
-        """Get all availability for a user"""
-        self.cursor.execute("SELECT * FROM availability WHERE user_id = ?", (user_id,))
+    def get_user_availability(self, user_id: int, window_start: int = None, window_end: int = None) -> List[Dict]:
+        """
+        Get all availability for a user, or with a window (epoch seconds) only
+        the intervals overlapping [window_start, window_end)
+        """
+        if window_start is None or window_end is None:
+            self.cursor.execute("SELECT * FROM availability WHERE user_id = ?", (user_id,))
+        else:
+            self.cursor.execute(
+                "SELECT * FROM availability WHERE user_id = ? AND end_ts > ? AND start_ts < ? ORDER BY start_ts",
+                (user_id, window_start, window_end)
+            )
         return [dict(row) for row in self.cursor.fetchall()]
     
     def clear_user_availability(self, user_id: int):
         """Clear all availability for a user"""
         self.cursor.execute("DELETE FROM availability WHERE user_id = ?", (user_id,))
+        self.cursor.execute("DELETE FROM availability_bitsets WHERE user_id = ?", (user_id,))
+        self.cursor.execute("DELETE FROM availability_rules WHERE user_id = ?", (user_id,))
         self.conn.commit()
     
+    def add_availability_rule(self, user_id: int, rule: RecurrenceRule, source_text: str = None) -> int:
+        """Add a recurring availability rule for a user"""
+        self.cursor.execute(
+            """INSERT INTO availability_rules 
+               (user_id, weekdays, start_minute, end_minute, valid_from, valid_until, source_text) 
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            self._rule_row(user_id, rule, source_text)
+        )
+        self.conn.commit()
+        return self.cursor.lastrowid
+    
+    @staticmethod
+    def _rule_row(user_id: int, rule: RecurrenceRule, source_text: str) -> tuple:
+        return (user_id, ",".join(map(str, rule.weekdays)), rule.start_minute, rule.end_minute,
+                rule.valid_from, rule.valid_until, source_text)
+    
+    def get_user_availability_rules(self, user_id: int) -> List[RecurrenceRule]:
+        """Get all recurring availability rules for a user"""
+        self.cursor.execute("SELECT * FROM availability_rules WHERE user_id = ?", (user_id,))
+        return [RecurrenceRule.from_row(row) for row in self.cursor.fetchall()]
+    
+    def get_user_rule_occurrences(self, user_id: int, window_start: int, window_end: int) -> List[Dict]:
+        """
+        Occurrences of a user's recurring rules inside [window_start, window_end),
+        in the same format as get_user_availability rows
+        """
+        self.cursor.execute("SELECT * FROM availability_rules WHERE user_id = ?", (user_id,))
+        occurrences = [
+            {'rule_id': row['id'], 'user_id': user_id,
+             'start_time': from_epoch(slot.start).isoformat(), 'end_time': from_epoch(slot.end).isoformat(),
+             'source_text': row['source_text'], 'start_ts': slot.start, 'end_ts': slot.end}
+            for row in self.cursor.fetchall()
+            for slot in RecurrenceRule.from_row(row).occurrences(window_start, window_end)
+        ]
+        return sorted(occurrences, key=lambda occurrence: occurrence['start_ts'])
+    
+    def get_user_availability_slots(self, user_id: int, window_start: int, window_end: int) -> List[Slot]:
+        """
+        A user's availability as Slots: the stored one-off intervals plus the
+        occurrences of their recurring rules inside [window_start, window_end),
+        clipped to it
+        """
+        slots = [Slot(max(slot.start, window_start), min(slot.end, window_end), slot.user_id)
+                 for slot in format_availability_for_scheduler(
+                     self.get_user_availability(user_id, window_start, window_end))]
+        slots.extend(expand_rules(self.get_user_availability_rules(user_id), window_start, window_end))
+        return slots
+    
+    def replace_user_availability(self, user_id: int, slots: List[tuple], source_text: str = None,
+                                  rules: List[RecurrenceRule] = None) -> List[int]:
+        """
+        Atomically replace a user's availability with (start_time, end_time)
+        slots and optional recurring rules. Readers see either the old or the
+        new set, never an empty one in between. Returns the new row IDs.
+        """
+        availability = {user_id: [(start_time, end_time, source_text) for start_time, end_time in slots]}
+        user_rules = {user_id: [(rule, source_text) for rule in rules or []]}
+        with self.conn:
+            self._replace_availability(availability, user_rules)
+            # The user's old rows were just deleted, so these are the new ones
+            self.cursor.execute("SELECT id FROM availability WHERE user_id = ? ORDER BY id", (user_id,))
+            return [row['id'] for row in self.cursor.fetchall()]
+    
+    def replace_availability_bulk(self, availability: Dict[int, List[tuple]],
+                                  rules: Dict[int, List[tuple]] = None) -> int:
+        """
+        Replace the availability of several users in one transaction.
+        Maps each user_id to a list of (start_time, end_time, source_text), and
+        optionally to a list of (RecurrenceRule, source_text) in ``rules``.
+        Returns the number of availability rows inserted.
+        """
+        with self.conn:
+            return self._replace_availability(availability, rules or {})
+    
+    def _replace_availability(self, availability: Dict[int, List[tuple]], rules: Dict[int, List[tuple]]) -> int:
+        """Delete and re-insert the listed users' rows, rules and bitsets (caller commits)"""
+        users = [(user_id,) for user_id in {**availability, **rules}]
+        intervals = {user_id: [(to_epoch(start_time), to_epoch(end_time)) for start_time, end_time, _ in slots]
+                     for user_id, slots in availability.items()}
+        rows = [(user_id, start_time, end_time, source_text, start_ts, end_ts)
+                for user_id, slots in availability.items()
+                for (start_time, end_time, source_text), (start_ts, end_ts) in zip(slots, intervals[user_id])]
+        rule_rows = [self._rule_row(user_id, rule, source_text)
+                     for user_id, user_rules in rules.items()
+                     for rule, source_text in user_rules]
+        self.cursor.executemany("DELETE FROM availability WHERE user_id = ?", users)
+        self.cursor.executemany("DELETE FROM availability_bitsets WHERE user_id = ?", users)
+        self.cursor.executemany("DELETE FROM availability_rules WHERE user_id = ?", users)
+        self.cursor.executemany(
+            """INSERT INTO availability_rules 
+               (user_id, weekdays, start_minute, end_minute, valid_from, valid_until, source_text) 
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            rule_rows
+        )
+        self.cursor.executemany(
+            """INSERT INTO availability (user_id, start_time, end_time, source_text, start_ts, end_ts) 
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            rows
+        )
+        for user_id, user_intervals in intervals.items():
+            self._write_availability_bitsets(user_id, user_intervals)
+        return len(rows)
+    
+    def get_user_availability_bitsets(self, user_id: int, window_start: int = None,
+                                      window_end: int = None) -> Dict[int, int]:
+        """
+        Get a user's availability as {week_start: bits} (see availability_bitset),
+        optionally only the weeks overlapping [window_start, window_end)
+        """
+        if window_start is None or window_end is None:
+            self.cursor.execute(
+                "SELECT week_start, bits FROM availability_bitsets WHERE user_id = ?", (user_id,)
+            )
+        else:
+            self.cursor.execute(
+                "SELECT week_start, bits FROM availability_bitsets WHERE user_id = ? AND week_start > ? AND week_start < ?",
+                (user_id, window_start - availability_bitset.WEEK_SECONDS, window_end)
+            )
+        return {row['week_start']: availability_bitset.from_bytes(row['bits']) for row in self.cursor.fetchall()}
+    
+    def get_user_window_bitsets(self, user_id: int, window_start: int, window_end: int) -> Dict[int, int]:
+        """
+        The availability of get_user_availability_slots as bitsets: stored
+        weeks plus recurring rule occurrences, limited to [window_start, window_end)
+        """
+        available = self.get_user_availability_bitsets(user_id, window_start, window_end)
+        rules = self.get_user_availability_rules(user_id)
+        if rules:
+            available = availability_bitset.union(available, availability_bitset.encode(
+                (slot.start, slot.end) for slot in expand_rules(rules, window_start, window_end)
+            ))
+        # Stored bitsets cover whole weeks; drop the quanta outside the window
+        return availability_bitset.intersect(available, availability_bitset.encode([(window_start, window_end)]))
+    
+    def _merge_availability_bitsets(self, user_id: int, weeks: Dict[int, int]):
+        """OR new quanta into a user's stored weeks (caller commits)"""
+        for week, bits in weeks.items():
+            self.cursor.execute(
+                "SELECT bits FROM availability_bitsets WHERE user_id = ? AND week_start = ?",
+                (user_id, week)
+            )
+            row = self.cursor.fetchone()
+            if row:
+                bits |= availability_bitset.from_bytes(row['bits'])
+            self.cursor.execute(
+                "INSERT OR REPLACE INTO availability_bitsets (user_id, week_start, bits) VALUES (?, ?, ?)",
+                (user_id, week, availability_bitset.to_bytes(bits))
+            )
+    
+    def _rebuild_availability_bitsets(self, user_id: int):
+        """Re-encode a user's bitsets from their availability rows (caller commits)"""
+        self.cursor.execute(
+            "SELECT start_ts, end_ts FROM availability WHERE user_id = ? AND start_ts IS NOT NULL", (user_id,)
+        )
+        self._write_availability_bitsets(user_id, [(row['start_ts'], row['end_ts']) for row in self.cursor.fetchall()])
+    
+    def _write_availability_bitsets(self, user_id: int, intervals):
+        """Replace a user's bitsets with the encoding of (start, end) epoch intervals (caller commits)"""
+        weeks = availability_bitset.encode(intervals)
+        self.cursor.execute("DELETE FROM availability_bitsets WHERE user_id = ?", (user_id,))
+        self.cursor.executemany(
+            "INSERT INTO availability_bitsets (user_id, week_start, bits) VALUES (?, ?, ?)",
+            [(user_id, week, availability_bitset.to_bytes(bits)) for week, bits in weeks.items()]
+        )
+    
     # Interview operations
     def schedule_interview(self, candidate_id: int, recruiter_id: int, 
                            start_time: str, end_time: str, location: str = None) -> int:
         """Schedule a new interview"""
         self.cursor.execute(
             """INSERT INTO interviews 
-               (candidate_id, recruiter_id, start_time, end_time, location) 
-               VALUES (?, ?, ?, ?, ?)""",
-            (candidate_id, recruiter_id, start_time, end_time, location)
+               (candidate_id, recruiter_id, start_time, end_time, location, start_ts, end_ts) 
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (candidate_id, recruiter_id, start_time, end_time, location, to_epoch(start_time), to_epoch(end_time))
         )
         self.conn.commit()
         return self.cursor.lastrowid
     
+    def schedule_interviews_bulk(self, interviews: List[tuple]) -> List[int]:
+        """
+        Schedule several interviews in a single transaction.
+        Each item is (candidate_id, recruiter_id, start_time, end_time, location).
+        """
+        interview_ids = []
+        with self.conn:
+            for candidate_id, recruiter_id, start_time, end_time, location in interviews:
+                self.cursor.execute(
+                    """INSERT INTO interviews 
+                       (candidate_id, recruiter_id, start_time, end_time, location, start_ts, end_ts) 
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (candidate_id, recruiter_id, start_time, end_time, location,
+                     to_epoch(start_time), to_epoch(end_time))
+                )
+                interview_ids.append(self.cursor.lastrowid)
+        return interview_ids
+    
     def get_interview(self, interview_id: int) -> Dict:
         """Get interview by ID"""
         self.cursor.execute("SELECT * FROM interviews WHERE id = ?", (interview_id,))
         return dict(self.cursor.fetchone() or {})
     
-    def get_user_interviews(self, user_id: int) -> List[Dict]:
-        """Get all interviews for a user (as candidate or recruiter)"""
-        self.cursor.execute(
-            """SELECT * FROM interviews 
-               WHERE candidate_id = ? OR recruiter_id = ?
-               ORDER BY start_time""", 
-            (user_id, user_id)
-        )
+    def get_user_interviews(self, user_id: int, window_start: int = None, window_end: int = None) -> List[Dict]:
+        """
+        Get all interviews for a user (as candidate or recruiter), or with a
+        window (epoch seconds) only those overlapping [window_start, window_end)
+        """
+        # Two index range scans instead of an OR that forces a full table scan;
+        # the second branch skips interviews a user has with themselves
+        if window_start is None or window_end is None:
+            self.cursor.execute(
+                """SELECT * FROM interviews WHERE candidate_id = ?
+                   UNION ALL
+                   SELECT * FROM interviews WHERE recruiter_id = ? AND candidate_id != ?
+                   ORDER BY start_ts""", 
+                (user_id, user_id, user_id)
+            )
+        else:
+            self.cursor.execute(
+                """SELECT * FROM interviews WHERE candidate_id = ? AND end_ts > ? AND start_ts < ?
+                   UNION ALL
+                   SELECT * FROM interviews WHERE recruiter_id = ? AND candidate_id != ? AND end_ts > ? AND start_ts < ?
+                   ORDER BY start_ts""", 
+                (user_id, window_start, window_end, user_id, user_id, window_start, window_end)
+            )
         return [dict(row) for row in self.cursor.fetchall()]
     
     def update_interview_status(self, interview_id: int, status: str) -> bool:
@@ -208,21 +566,18 @@ class SimpleDatabase:
         }
     
     def close(self):
-        """Close the database connection"""
-        self.conn.close()
+        """Close every pooled connection"""
+        self.pool.close()
 
 
 # Helper function to convert database rows to the format expected by the scheduling algorithm
-def format_availability_for_scheduler(db_availabilities: List[Dict]) -> List[Dict]:
-    """Convert database availability format to scheduler format"""
-    formatted = []
-    for avail in db_availabilities:
-        formatted.append({
-            'start': avail['start_time'],
-            'end': avail['end_time'],
-            'user_id': avail['user_id']
-        })
-    return formatted
+def format_availability_for_scheduler(db_availabilities: List[Dict]) -> List[Slot]:
+    """Convert database availability rows to scheduler Slots"""
+    # Rows from before the epoch columns were backfilled fall back to parsing the text
+    return [Slot(avail.get('start_ts') or to_epoch(avail['start_time']),
+                 avail.get('end_ts') or to_epoch(avail['end_time']),
+                 avail['user_id'])
+            for avail in db_availabilities]
 
 
 # Example usage
@@ -0,0 +1,189 @@
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import dateparser
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY = "|".join(WEEKDAYS)
+
+# One pass over the text finds every date form we accept; longer relative
+# phrases come first so "day after tomorrow" is not read as "tomorrow"
+DATE_RE = re.compile(
+    rf"\b(?P<ordinal_day>\d{{1,2}})(?:st|nd|rd|th)? of (?P<ordinal_month>{_MONTH})\b"
+    rf"|\b(?P<month>{_MONTH})\.? (?P<day>\d{{1,2}})(?:st|nd|rd|th)?\b"
+    r"|\b(?P<numeric>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b"
+    rf"|\b(?P<relative>day after tomorrow|today|tomorrow|this week|next week|(?:next |this )?(?:{_WEEKDAY}))\b",
+    re.IGNORECASE
+)
+
+TIME_RE = re.compile(r"(?<!\d)(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b", re.IGNORECASE)
+
+# "10-4", "9 to 5", "1-4 pm", "10:30 am until 2 pm"; meridiems are optional.
+# Not part of a numeric date ("3-15-2025") and not a count ("2-3 weeks").
+RANGE_RE = re.compile(
+    r"(?<![\d/:.-])(?P<start>\d{1,2})(?::(?P<start_minute>\d{2}))?\s*(?P<start_meridiem>am|pm)?"
+    r"\s*(?:-|\u2013|to|until|till)\s*"
+    r"(?P<end>\d{1,2})(?::(?P<end_minute>\d{2}))?\s*(?P<end_meridiem>am|pm)?\b"
+    r"(?![/-]\d)(?!\s*(?:minutes?|mins?|hours?|hrs?|days?|weeks?|months?)\b)",
+    re.IGNORECASE
+)
+
+# Without am/pm, hours before this are read as afternoon ("10-4" is 10:00-16:00)
+EARLIEST_BARE_HOUR = 8
+
+
+class DateResolver:
+    """
+    Resolves the date and time expressions the availability parser accepts
+    with precompiled regexes and lookup tables built once per reference date.
+    dateparser is only called for matches these tables cannot resolve.
+    """
+
+    def __init__(self, reference_date: date):
+        self.reference_date = reference_date
+        today = datetime(reference_date.year, reference_date.month, reference_date.day)
+        self.relative_dates = {
+            "today": today,
+            "tomorrow": today + timedelta(days=1),
+            "day after tomorrow": today + timedelta(days=2),
+            "this week": today,
+            "next week": today + timedelta(days=7),
+        }
+        for name, weekday in WEEKDAYS.items():
+            days_ahead = (weekday - today.weekday()) % 7
+            # A bare or "this" weekday is the next one from today on;
+            # "next <weekday>" is always in the future
+            self.relative_dates[name] = today + timedelta(days=days_ahead)
+            self.relative_dates[f"this {name}"] = today + timedelta(days=days_ahead)
+            self.relative_dates[f"next {name}"] = today + timedelta(days=days_ahead or 7)
+
+    def find_dates(self, text: str) -> List[datetime]:
+        """All distinct dates mentioned in the text, in order of appearance"""
+        dates = []
+        for match in DATE_RE.finditer(text):
+            resolved = self.resolve_match(match)
+            if resolved is not None and resolved not in dates:
+                dates.append(resolved)
+        return dates
+
+    def parse(self, text: str) -> Optional[datetime]:
+        """The first date in the text, falling back to dateparser for unknown forms"""
+        dates = self.find_dates(text)
+        if dates:
+            return dates[0]
+        return self._fallback(text)
+
+    def find_times(self, text: str) -> List[float]:
+        """Clock times such as "2 pm" or "10:30 am", as fractional hours"""
+        hours = []
+        for hour, minute, meridiem in TIME_RE.findall(text):
+            hour, minute = int(hour), int(minute or 0)
+            if 1 <= hour <= 12 and minute < 60:
+                hours.append(hour % 12 + (12 if meridiem.lower() == "pm" else 0) + minute / 60)
+            else:
+                parsed_time = dateparser.parse(f"{hour}:{minute:02d} {meridiem}")
+                if parsed_time:
+                    hours.append(parsed_time.hour + parsed_time.minute / 60)
+        return hours
+
+    def find_time_ranges(self, text: str) -> Tuple[List[Tuple[float, float]], str]:
+        """
+        Explicit ranges such as "10-4" or "1-4 pm", as (start, end) fractional
+        hours, plus the text with those ranges blanked out so find_times does
+        not read their endpoints again. Ranges inside a date are skipped.
+        """
+        date_spans = [match.span() for match in DATE_RE.finditer(text)]
+        ranges = []
+        rest = text
+        for match in RANGE_RE.finditer(text):
+            if any(start < match.end() and match.start() < end for start, end in date_spans):
+                continue
+            resolved = self._resolve_range(match)
+            if resolved is not None:
+                ranges.append(resolved)
+                rest = rest[:match.start()] + " " * (match.end() - match.start()) + rest[match.end():]
+        return ranges, rest
+
+    @staticmethod
+    def _resolve_range(match) -> Optional[Tuple[float, float]]:
+        start, end = int(match.group("start")), int(match.group("end"))
+        start_minute, end_minute = int(match.group("start_minute") or 0), int(match.group("end_minute") or 0)
+        start_meridiem = (match.group("start_meridiem") or "").lower()
+        end_meridiem = (match.group("end_meridiem") or "").lower()
+        if not (1 <= start <= 12 and 1 <= end <= 12 and start_minute < 60 and end_minute < 60):
+            return None
+
+        def to_hours(hour: int, minute: int, meridiem: str) -> float:
+            return hour % 12 + (12 if meridiem == "pm" else 0) + minute / 60
+
+        if end_meridiem:
+            end_hours = to_hours(end, end_minute, end_meridiem)
+            # "1-4 pm" shares the meridiem, "10-2 pm" starts in the morning
+            start_hours = to_hours(start, start_minute, start_meridiem or end_meridiem)
+            if not start_meridiem and start_hours >= end_hours:
+                start_hours = to_hours(start, start_minute, "am")
+        else:
+            if start_meridiem:
+                start_hours = to_hours(start, start_minute, start_meridiem)
+            else:
+                start_hours = to_hours(start, start_minute, "am" if EARLIEST_BARE_HOUR <= start < 12 else "pm")
+            end_hours = to_hours(end, end_minute, "am")
+            if end_hours <= start_hours:
+                end_hours += 12
+        if not start_hours < end_hours <= 24:
+            return None
+        return start_hours, end_hours
+
+    def resolve_match(self, match) -> Optional[datetime]:
+        """The date a DATE_RE match refers to"""
+        groups = match.groupdict()
+        if groups["relative"]:
+            return self.relative_dates[" ".join(groups["relative"].lower().split())]
+        if groups["numeric"]:
+            return self._resolve_numeric(groups["numeric"])
+        if groups["ordinal_day"]:
+            day, month = groups["ordinal_day"], groups["ordinal_month"]
+        else:
+            day, month = groups["day"], groups["month"]
+        return self._build(self.reference_date.year, MONTHS[month.lower()], int(day), match.group(0))
+
+    def _resolve_numeric(self, value: str) -> Optional[datetime]:
+        # Month first, as dateparser reads these for English input
+        month, day, year = (int(part) for part in re.split(r"[/-]", value))
+        if year < 100:
+            year += 2000
+        return self._build(year, month, day, value)
+
+    def _build(self, year: int, month: int, day: int, source: str) -> Optional[datetime]:
+        try:
+            return datetime(year, month, day)
+        except ValueError:
+            # e.g. a day-first date such as 15/03/2025
+            return self._fallback(source)
+
+    @staticmethod
+    def _fallback(text: str) -> Optional[datetime]:
+        parsed_date = dateparser.parse(text)
+        if parsed_date is None:
+            return None
+        return datetime(parsed_date.year, parsed_date.month, parsed_date.day)
+
+
+@lru_cache(maxsize=4)
+def resolver_for(reference_date: date) -> DateResolver:
+    """Shared resolver for a reference date; the tables are rebuilt when the day changes"""
+    return DateResolver(reference_date)
@@ -1,18 +1,31 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Body, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import uvicorn
 from datetime import datetime, timedelta
 import json
 import logging
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
 
 # Import our modules
 from nlp_module import AvailabilityParser
+from nlp_executor import NLPExecutor, ExecutorSaturated
+from parse_cache import ParseCache
 from ml_module import SmartScheduler
 from calender_module import CalendarIntegration as CalendarService
-from database_models import SimpleDatabase, format_availability_for_scheduler
+from database_models import SimpleDatabase
+from async_database import AsyncDatabase
 from email_module import EmailNotification
+from model_store import ModelStore
+from retraining import RetrainingWorker
+from batch_scheduler import BatchScheduler
+from config import DATABASE_CONFIG, MODEL_CONFIG, NLP_CONFIG, SCHEDULER_CONFIG
+from recurrence import expand_rules
+from slot_model import split_slots
+from time_utils import to_epoch, from_epoch, SECONDS_PER_DAY
 
 # Initialize FastAPI
 app = FastAPI(title="AI Scheduling Bot", description="An AI-powered scheduling bot for interviews")
@@ -27,10 +40,51 @@ app.add_middleware(
 )
 
 # Initialize services
-nlp_parser = AvailabilityParser()
-scheduler = SmartScheduler()
-db = SimpleDatabase()
+parse_cache = ParseCache(
+    max_entries=NLP_CONFIG['PARSE_CACHE_SIZE'],
+    ttl_seconds=NLP_CONFIG['PARSE_CACHE_TTL_SECONDS'],
+    db_path=NLP_CONFIG['PARSE_CACHE_DB']
+)
+nlp_parser = AvailabilityParser(NLP_CONFIG['SPACY_MODEL'], use_spacy=NLP_CONFIG['SPACY_FALLBACK'],
+                                cache=parse_cache)
+nlp_executor = NLPExecutor(
+    NLP_CONFIG['SPACY_MODEL'],
+    use_spacy=NLP_CONFIG['SPACY_FALLBACK'],
+    max_workers=NLP_CONFIG['WORKERS'],
+    chunk_size=NLP_CONFIG['WORKER_CHUNK_SIZE'],
+    batch_size=NLP_CONFIG['PIPE_BATCH_SIZE'],
+    cache=parse_cache,
+    max_pending=NLP_CONFIG['MAX_PENDING_PARSES']
+)
+scheduler = SmartScheduler(history_ttl_seconds=SCHEDULER_CONFIG['HISTORY_TTL_SECONDS'])
+db = SimpleDatabase(
+    DATABASE_CONFIG['PATH'],
+    journal_mode=DATABASE_CONFIG['JOURNAL_MODE'],
+    synchronous=DATABASE_CONFIG['SYNCHRONOUS'],
+    busy_timeout_ms=DATABASE_CONFIG['BUSY_TIMEOUT_MS'],
+    cached_statements=DATABASE_CONFIG['CACHED_STATEMENTS']
+)
+async_db = AsyncDatabase(db, max_workers=DATABASE_CONFIG['ASYNC_WORKERS'])
 calendar_service = CalendarService()
+batch_scheduler = BatchScheduler(scheduler, db, horizon_days=SCHEDULER_CONFIG['SEARCH_HORIZON_DAYS'],
+                                 granularity_minutes=SCHEDULER_CONFIG['START_GRANULARITY_MINUTES'])
+model_store = ModelStore(MODEL_CONFIG['ARTIFACT_DIR'], MODEL_CONFIG['KEEP_VERSIONS'])
+
+# Warm start from the latest trained model, if any
+try:
+    scheduler.load_latest_model(model_store)
+except Exception as e:
+    logging.error(f"Failed to load scheduler model: {str(e)}")
+
+retraining_worker = RetrainingWorker(
+    scheduler,
+    db.db_path,
+    model_store,
+    interval_seconds=MODEL_CONFIG['RETRAIN_INTERVAL_SECONDS'],
+    min_new_outcomes=MODEL_CONFIG['RETRAIN_MIN_NEW_OUTCOMES'],
+    chunk_size=MODEL_CONFIG['RETRAIN_CHUNK_SIZE'],
+    lock_path=MODEL_CONFIG['RETRAIN_LOCK_PATH']
+)
 
 # Pydantic models for request/response validation
 class UserCreate(BaseModel):
@@ -42,6 +96,10 @@ class UserCreate(BaseModel):
 class AvailabilityInput(BaseModel):
     user_id: int
     text: str
+    expand: bool = False  # Return 30-minute slots instead of merged intervals
+
+class BatchAvailabilityInput(BaseModel):
+    items: List[AvailabilityInput]
 
 class ManualAvailability(BaseModel):
     user_id: int
@@ -52,6 +110,17 @@ class ScheduleRequest(BaseModel):
     recruiter_id: int
     duration_minutes: int = 60
 
+class PanelScheduleRequest(BaseModel):
+    candidate_id: int
+    interviewer_ids: List[int]
+    duration_minutes: int = 60
+
+class BatchScheduleRequest(BaseModel):
+    candidate_ids: List[int]
+    recruiter_ids: List[int]
+    duration_minutes: int = 60
+    recruiter_capacity: Optional[int] = None
+
 class EmailScheduleRequest(BaseModel):
     candidate_email: str
     recruiter_email: str
@@ -80,15 +149,31 @@ def get_db():
     finally:
         pass  # We'll keep the connection open for the app lifecycle
 
+# Dependency for the async endpoints; queries run off the event loop
+def get_async_db():
+    yield async_db
+
+# Keeps the scheduler's cached interview histories in step with the database
+def set_interview_status(interview_id: int, status: str) -> bool:
+    interview = db.get_interview(interview_id)
+    success = db.update_interview_status(interview_id, status)
+    if success and interview:
+        scheduler.record_status_change(interview, status)
+        if status in RetrainingWorker.OUTCOME_STATUSES:
+            retraining_worker.notify_outcome()
+    return success
+
 # Helper function to send calendar invites
 async def send_calendar_invites(interview_id: int):
     try:
-        interview = db.get_interview(interview_id)
+        interview = await async_db.get_interview(interview_id)
         if not interview:
             return
         
-        candidate = db.get_user(interview['candidate_id'])
-        recruiter = db.get_user(interview['recruiter_id'])
+        candidate, recruiter = await asyncio.gather(
+            async_db.get_user(interview['candidate_id']),
+            async_db.get_user(interview['recruiter_id'])
+        )
         
         # Format interview times
         start_time = datetime.fromisoformat(interview['start_time'])
@@ -126,11 +211,47 @@ async def send_calendar_invites(interview_id: int):
         )
         
         # Update interview status
-        db.update_interview_status(interview_id, "confirmed")
+        await async_db.run(set_interview_status, interview_id, "confirmed")
         
     except Exception as e:
         logging.error(f"Failed to send calendar invites: {str(e)}")
-        db.update_interview_status(interview_id, "pending")
+        await async_db.run(set_interview_status, interview_id, "pending")
+
+# Picks up models published by other workers or the retraining job
+async def watch_model_store():
+    while True:
+        await asyncio.sleep(MODEL_CONFIG['RELOAD_INTERVAL_SECONDS'])
+        try:
+            if await asyncio.to_thread(scheduler.load_latest_model, model_store):
+                logging.info(f"Loaded scheduler model version {scheduler.model_version}")
+        except Exception as e:
+            logging.error(f"Failed to reload scheduler model: {str(e)}")
+
+@app.on_event("startup")
+async def start_model_watcher():
+    app.state.model_watcher = asyncio.create_task(watch_model_store())
+    if MODEL_CONFIG['RETRAIN_ENABLED']:
+        retraining_worker.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    retraining_worker.stop(timeout=5)
+    nlp_executor.shutdown(wait=False)
+    async_db.shutdown()
+    db.close()
+
+def search_window() -> tuple:
+    """Epoch range, from now, over which recurring availability is expanded"""
+    window_start = to_epoch(datetime.now())
+    return window_start, window_start + SCHEDULER_CONFIG['SEARCH_HORIZON_DAYS'] * SECONDS_PER_DAY
+
+def availability_dicts(slots, source_text: str) -> List[Dict]:
+    """Parsed Slots in the availability response format"""
+    return [{
+        "start": from_epoch(slot.start).isoformat(),
+        "end": from_epoch(slot.end).isoformat(),
+        "source_text": source_text
+    } for slot in slots]
 
 # Routes
 @app.get("/")
@@ -154,79 +275,186 @@ def get_users_by_type(user_type: str, db=Depends(get_db)):
     return db.get_users_by_type(user_type)
 
 @app.post("/availability/parse", response_model=List[dict])
-def parse_availability(input_data: AvailabilityInput, db=Depends(get_db)):
-    # Use NLP to parse the text input
-    availability_slots = nlp_parser.extract_availability(input_data.text)
-    
-    # Clear existing availability
-    db.clear_user_availability(input_data.user_id)
-    
-    # Store the parsed availability
-    for slot in availability_slots:
-        db.add_availability(
+async def parse_availability(input_data: AvailabilityInput, db=Depends(get_async_db)):
+    # Recurring availability is stored as weekly rules, next to any one-off
+    # dates the same text mentions. The extraction can fall back to
+    # dateparser, so it runs off the event loop.
+    rules, one_off = await asyncio.to_thread(nlp_parser.extract_recurring, input_data.text)
+    if rules:
+        await db.replace_user_availability(
             input_data.user_id,
-            slot['start'],
-            slot['end'],
-            input_data.text
+            [(slot['start'], slot['end']) for slot in availability_dicts(one_off, input_data.text)],
+            input_data.text,
+            rules
         )
+        # Answer in the usual slot format, with the rules expanded over the search window
+        slots = sorted(expand_rules(rules, *search_window()) + one_off, key=lambda slot: slot.start)
+        if input_data.expand:
+            slots = split_slots(slots, nlp_parser.SLOT_MINUTES)
+        return availability_dicts(slots, input_data.text)
+    
+    # Use NLP to parse the text input into merged intervals, in the parser
+    # pool so slow parses do not tie up the request threads. Submitting checks
+    # the parse cache, which may read SQLite, so that runs off the loop too.
+    try:
+        future = await asyncio.to_thread(nlp_executor.submit, input_data.text)
+    except ExecutorSaturated:
+        raise HTTPException(status_code=429, detail="Too many availability parses in progress, please retry",
+                            headers={"Retry-After": "1"})
+    try:
+        slots = await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        # The chunk was already retried once on a fresh pool
+        raise HTTPException(status_code=503, detail="Availability parser unavailable, please retry",
+                            headers={"Retry-After": "1"})
+    availability_slots = availability_dicts(slots, input_data.text)
+    
+    # Replace existing availability with the parsed intervals in one transaction
+    await db.replace_user_availability(
+        input_data.user_id,
+        [(slot['start'], slot['end']) for slot in availability_slots],
+        input_data.text
+    )
     
+    if input_data.expand:
+        return availability_dicts(split_slots(slots, nlp_parser.SLOT_MINUTES), input_data.text)
     return availability_slots
 
+@app.post("/availability/parse/batch")
+def parse_availability_batch(input_data: BatchAvailabilityInput, db=Depends(get_db)):
+    """
+    Parse many availability texts in the NLP worker pool. Per-item results
+    stream back as NDJSON lines as they finish; once every text is parsed,
+    the availability of all users is replaced in one bulk transaction.
+    """
+    items = input_data.items
+
+    def stream():
+        availability = {}
+        rules = {}
+        parsed_count = 0
+        # Recurring texts become weekly rules here; only one-off texts go to the pool
+        one_off = []
+        for index, item in enumerate(items):
+            item_rules, item_slots = nlp_parser.extract_recurring(item.text)
+            if not item_rules:
+                one_off.append(index)
+                continue
+            parsed_count += 1
+            rules.setdefault(item.user_id, []).extend((rule, item.text) for rule in item_rules)
+            parsed = availability_dicts(item_slots, item.text)
+            availability.setdefault(item.user_id, []).extend(
+                (slot["start"], slot["end"], slot["source_text"]) for slot in parsed
+            )
+            yield json.dumps({
+                "index": index,
+                "user_id": item.user_id,
+                "rules": [{**rule.to_dict(), "source_text": item.text} for rule in item_rules],
+                "slots": parsed
+            }) + "\n"
+
+        for pool_index, slots, error in nlp_executor.parse_batch([items[index].text for index in one_off]):
+            index = one_off[pool_index]
+            item = items[index]
+            if error is not None:
+                yield json.dumps({"index": index, "user_id": item.user_id, "error": error}) + "\n"
+                continue
+
+            parsed_count += 1
+            parsed = availability_dicts(slots, item.text)
+            availability.setdefault(item.user_id, []).extend(
+                (slot["start"], slot["end"], slot["source_text"]) for slot in parsed
+            )
+            if item.expand:
+                parsed = availability_dicts(split_slots(slots, nlp_parser.SLOT_MINUTES), item.text)
+            yield json.dumps({"index": index, "user_id": item.user_id, "slots": parsed}) + "\n"
+
+        stored_slots = db.replace_availability_bulk(availability, rules)
+        yield json.dumps({
+            "done": True,
+            "parsed": parsed_count,
+            "failed": len(items) - parsed_count,
+            "stored_slots": stored_slots,
+            "stored_rules": sum(len(user_rules) for user_rules in rules.values())
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/availability/parse/cache", response_model=dict)
+def get_parse_cache_stats():
+    return parse_cache.stats()
+
+@app.get("/metrics/nlp", response_model=dict)
+def get_nlp_metrics():
+    return {"executor": nlp_executor.metrics(), "parse_cache": parse_cache.stats()}
+
 @app.post("/availability/manual", response_model=dict)
 def add_manual_availability(input_data: ManualAvailability, db=Depends(get_db)):
-    # Clear existing availability
-    db.clear_user_availability(input_data.user_id)
-    
-    # Add each availability slot
-    added_slots = []
     for slot in input_data.slots:
-        slot_id = db.add_availability(
-            input_data.user_id,
-            slot['start'],
-            slot['end'],
-            "Manually added"
-        )
-        added_slots.append(slot_id)
+        try:
+            to_epoch(slot['start']), to_epoch(slot['end'])
+        except (KeyError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid slot {slot}: {str(e)}")
+    
+    # Replace existing availability with the given slots in one transaction
+    added_slots = db.replace_user_availability(
+        input_data.user_id,
+        [(slot['start'], slot['end']) for slot in input_data.slots],
+        "Manually added"
+    )
     
     return {"user_id": input_data.user_id, "added_slots": added_slots}
 
 @app.get("/availability/{user_id}", response_model=List[dict])
 def get_user_availability(user_id: int, db=Depends(get_db)):
-    return db.get_user_availability(user_id)
+    # Stored slots plus the upcoming occurrences of recurring rules
+    return db.get_user_availability(user_id) + db.get_user_rule_occurrences(user_id, *search_window())
+
+@app.get("/availability/{user_id}/rules", response_model=List[dict])
+def get_user_availability_rules(user_id: int, db=Depends(get_db)):
+    return [rule.to_dict() for rule in db.get_user_availability_rules(user_id)]
 
 @app.post("/schedule", response_model=dict)
 async def schedule_interview(
     request: ScheduleRequest, 
     background_tasks: BackgroundTasks,
-    db=Depends(get_db)
+    db=Depends(get_async_db)
 ):
     # Get candidate and recruiter info
-    candidate = db.get_user(request.candidate_id)
-    recruiter = db.get_user(request.recruiter_id)
+    candidate, recruiter = await asyncio.gather(
+        db.get_user(request.candidate_id),
+        db.get_user(request.recruiter_id)
+    )
     
     if not candidate or not recruiter:
         raise HTTPException(status_code=404, detail="Candidate or recruiter not found")
     
-    # Get availability
-    candidate_avail = db.get_user_availability(request.candidate_id)
-    recruiter_avail = db.get_user_availability(request.recruiter_id)
+    # Get availability bitsets, with recurring rules expanded over the search window
+    window = search_window()
+    candidate_bits, recruiter_bits = await asyncio.gather(
+        db.get_user_window_bitsets(request.candidate_id, *window),
+        db.get_user_window_bitsets(request.recruiter_id, *window)
+    )
     
-    if not candidate_avail or not recruiter_avail:
+    if not candidate_bits or not recruiter_bits:
         raise HTTPException(status_code=400, detail="Missing availability data")
     
-    # Format availability for scheduler
-    candidate_slots = format_availability_for_scheduler(candidate_avail)
-    recruiter_slots = format_availability_for_scheduler(recruiter_avail)
-    
-    # Get recent interviews for learning patterns
-    recent_interviews = db.get_user_interviews(request.recruiter_id)
+    # Get recent interview patterns (loaded once, then maintained incrementally)
+    recruiter_history = await db.run(
+        scheduler.get_history, request.recruiter_id,
+        lambda: db.sync_db.get_user_interviews(request.recruiter_id)
+    )
     
     # Find optimal slots
-    optimal_slots = scheduler.find_optimal_slots(
-        candidate_slots,
-        recruiter_slots,
+    optimal_slots = scheduler.find_optimal_slots_from_bitsets(
+        candidate_bits,
+        recruiter_bits,
         {"id": candidate["id"], "priority": candidate["priority"]},
-        recent_interviews
+        history=recruiter_history,
+        top_k=1,
+        recruiter_id=request.recruiter_id,
+        duration_minutes=request.duration_minutes,
+        granularity_minutes=SCHEDULER_CONFIG['START_GRANULARITY_MINUTES']
     )
     
     if not optimal_slots:
@@ -235,21 +463,22 @@ async def schedule_interview(
     # Take the best slot
     best_slot = optimal_slots[0]
     
-    # Calculate end time based on requested duration
-    start_time = datetime.fromisoformat(best_slot['start'])
-    end_time = start_time + timedelta(minutes=request.duration_minutes)
+    # The slot already spans the requested duration
+    start_time = from_epoch(best_slot.start)
+    end_time = from_epoch(best_slot.end)
     
     # Generate a simple meeting link (would be replaced with actual meeting generation)
     meeting_link = f"https://meet.company.com/{hash(start_time) % 1000000:06d}"
     
     # Schedule the interview
-    interview_id = db.schedule_interview(
+    interview_id = await db.schedule_interview(
         request.candidate_id,
         request.recruiter_id,
-        best_slot['start'],
+        start_time.isoformat(),
         end_time.isoformat(),
         meeting_link
     )
+    scheduler.record_interview(await db.get_interview(interview_id))
     
     # Send calendar invites asynchronously
     background_tasks.add_task(send_calendar_invites, interview_id)
@@ -258,12 +487,112 @@ async def schedule_interview(
         "interview_id": interview_id,
         "candidate": candidate["name"],
         "recruiter": recruiter["name"],
-        "start_time": best_slot['start'],
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "score": best_slot.score,
+        "meeting_link": meeting_link
+    }
+
+@app.post("/schedule/panel", response_model=dict)
+async def schedule_panel_interview(
+    request: PanelScheduleRequest,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_async_db)
+):
+    """
+    Schedule one interview slot for a candidate with a panel of interviewers.
+    The slot is chosen from the windows in which every participant is available,
+    and an interview record is created for each interviewer.
+    """
+    if not request.interviewer_ids:
+        raise HTTPException(status_code=400, detail="At least one interviewer is required")
+    
+    # Get candidate and interviewer info
+    candidate, *interviewers = await asyncio.gather(
+        db.get_user(request.candidate_id),
+        *(db.get_user(interviewer_id) for interviewer_id in request.interviewer_ids)
+    )
+    
+    if not candidate or not all(interviewers):
+        raise HTTPException(status_code=404, detail="Candidate or interviewer not found")
+    
+    # Get availability for every participant
+    participant_ids = [request.candidate_id] + request.interviewer_ids
+    window = search_window()
+    participant_avail = await asyncio.gather(
+        *(db.get_user_window_bitsets(user_id, *window) for user_id in participant_ids)
+    )
+    
+    if not all(participant_avail):
+        raise HTTPException(status_code=400, detail="Missing availability data")
+    
+    # Lead interviewer's history drives the historical bonus
+    lead_id = request.interviewer_ids[0]
+    lead_history = await db.run(
+        scheduler.get_history, lead_id, lambda: db.sync_db.get_user_interviews(lead_id)
+    )
+    
+    # Find the best window common to all participants
+    optimal_slots = scheduler.find_panel_slots_from_bitsets(
+        participant_avail,
+        {"id": candidate["id"], "priority": candidate["priority"]},
+        history=lead_history,
+        top_k=1,
+        duration_minutes=request.duration_minutes,
+        granularity_minutes=SCHEDULER_CONFIG['START_GRANULARITY_MINUTES']
+    )
+    
+    if not optimal_slots:
+        raise HTTPException(status_code=404, detail="No time found when all panel members are available")
+    
+    best_slot = optimal_slots[0]
+    start_time = from_epoch(best_slot.start)
+    end_time = from_epoch(best_slot.end)
+    meeting_link = f"https://meet.company.com/{hash(start_time) % 1000000:06d}"
+    
+    # One interview record per interviewer, sharing the same slot and link
+    interview_ids = []
+    for interviewer_id in request.interviewer_ids:
+        interview_id = await db.schedule_interview(
+            request.candidate_id,
+            interviewer_id,
+            start_time.isoformat(),
+            end_time.isoformat(),
+            meeting_link
+        )
+        scheduler.record_interview(await db.get_interview(interview_id))
+        background_tasks.add_task(send_calendar_invites, interview_id)
+        interview_ids.append(interview_id)
+    
+    return {
+        "interview_ids": interview_ids,
+        "candidate": candidate["name"],
+        "interviewers": [interviewer["name"] for interviewer in interviewers],
+        "start_time": start_time.isoformat(),
         "end_time": end_time.isoformat(),
-        "score": best_slot['score'],
+        "score": best_slot.score,
         "meeting_link": meeting_link
     }
 
+@app.post("/schedule/batch", response_model=dict)
+def schedule_batch(request: BatchScheduleRequest, background_tasks: BackgroundTasks, db=Depends(get_db)):
+    """
+    Place many candidates across a pool of recruiters in one run, without
+    double-booking anyone, and store all interviews in one transaction.
+    """
+    result = batch_scheduler.assign(
+        request.candidate_ids,
+        request.recruiter_ids,
+        duration_minutes=request.duration_minutes,
+        recruiter_capacity=request.recruiter_capacity
+    )
+    
+    # Send calendar invites asynchronously
+    for assignment in result['assignments']:
+        background_tasks.add_task(send_calendar_invites, assignment['interview_id'])
+    
+    return result
+
 @app.post("/schedule_by_email", response_model=dict)
 def schedule_interview_by_email(request: EmailScheduleRequest, db=Depends(get_db)):
     # Lookup candidate and recruiter by their email
@@ -282,6 +611,7 @@ def schedule_interview_by_email(request: EmailScheduleRequest, db=Depends(get_db
     
     # Schedule the interview
     interview_id = db.schedule_interview(candidate['id'], recruiter['id'], interview_start.isoformat(), interview_end.isoformat(), meeting_link)
+    scheduler.record_interview(db.get_interview(interview_id))
     
     # Activate background task to send calendar invites
     import asyncio
@@ -290,7 +620,7 @@ def schedule_interview_by_email(request: EmailScheduleRequest, db=Depends(get_db
     return {"interview_id": interview_id, "message": "Interview scheduled successfully"}
 
 @app.post("/auto_schedule_by_email", response_model=dict)
-async def auto_schedule_by_email(request: AutoScheduleRequest, background_tasks: BackgroundTasks, db=Depends(get_db)):
+async def auto_schedule_by_email(request: AutoScheduleRequest, background_tasks: BackgroundTasks, db=Depends(get_async_db)):
     """
     Automatically find the optimal time and schedule an interview based on candidate and recruiter emails.
     This endpoint handles the complete automation flow:
@@ -301,33 +631,40 @@ async def auto_schedule_by_email(request: AutoScheduleRequest, background_tasks:
     5. Send email notifications and calendar invites
     """
     # Lookup candidate and recruiter by their email
-    candidate = db.get_user_by_email(request.candidate_email)
-    recruiter = db.get_user_by_email(request.recruiter_email)
+    candidate, recruiter = await asyncio.gather(
+        db.get_user_by_email(request.candidate_email),
+        db.get_user_by_email(request.recruiter_email)
+    )
     
     if not candidate or not recruiter:
         raise HTTPException(status_code=404, detail="Candidate or Recruiter not found")
     
-    # Get availability for both users
-    candidate_avail = db.get_user_availability(candidate['id'])
-    recruiter_avail = db.get_user_availability(recruiter['id'])
+    # Get availability for both users, with recurring rules expanded over the search window
+    window = search_window()
+    candidate_bits, recruiter_bits = await asyncio.gather(
+        db.get_user_window_bitsets(candidate['id'], *window),
+        db.get_user_window_bitsets(recruiter['id'], *window)
+    )
     
-    if not candidate_avail or not recruiter_avail:
+    if not candidate_bits or not recruiter_bits:
         raise HTTPException(status_code=400, 
                            detail="Missing availability data. Please ensure both participants have shared their availability.")
     
-    # Format availability for scheduler
-    candidate_slots = format_availability_for_scheduler(candidate_avail)
-    recruiter_slots = format_availability_for_scheduler(recruiter_avail)
-    
-    # Get recent interviews for learning patterns
-    recent_interviews = db.get_user_interviews(recruiter['id'])
+    # Get recent interview patterns (loaded once, then maintained incrementally)
+    recruiter_history = await db.run(
+        scheduler.get_history, recruiter['id'], lambda: db.sync_db.get_user_interviews(recruiter['id'])
+    )
     
     # Find optimal slots using the AI scheduler
-    optimal_slots = scheduler.find_optimal_slots(
-        candidate_slots,
-        recruiter_slots,
+    optimal_slots = scheduler.find_optimal_slots_from_bitsets(
+        candidate_bits,
+        recruiter_bits,
         {"id": candidate["id"], "priority": candidate.get("priority", "medium")},
-        recent_interviews
+        history=recruiter_history,
+        top_k=1,
+        recruiter_id=recruiter['id'],
+        duration_minutes=request.duration_minutes,
+        granularity_minutes=SCHEDULER_CONFIG['START_GRANULARITY_MINUTES']
     )
     
     if not optimal_slots:
@@ -337,21 +674,22 @@ async def auto_schedule_by_email(request: AutoScheduleRequest, background_tasks:
     # Take the best slot
     best_slot = optimal_slots[0]
     
-    # Calculate end time based on requested duration
-    start_time = datetime.fromisoformat(best_slot['start'])
-    end_time = start_time + timedelta(minutes=request.duration_minutes)
+    # The slot already spans the requested duration
+    start_time = from_epoch(best_slot.start)
+    end_time = from_epoch(best_slot.end)
     
     # Generate a meeting link
     meeting_link = f"https://meet.company.com/{hash(start_time) % 1000000:06d}"
     
     # Schedule the interview
-    interview_id = db.schedule_interview(
+    interview_id = await db.schedule_interview(
         candidate['id'],
         recruiter['id'],
         start_time.isoformat(),
         end_time.isoformat(),
         meeting_link
     )
+    scheduler.record_interview(await db.get_interview(interview_id))
     
     # Schedule calendar invites and email notifications as a background task
     background_tasks.add_task(send_calendar_invites, interview_id)
@@ -366,7 +704,7 @@ async def auto_schedule_by_email(request: AutoScheduleRequest, background_tasks:
         "start_time": start_time.isoformat(),
         "end_time": end_time.isoformat(),
         "meeting_link": meeting_link,
-        "score": best_slot.get('score', 0.95),
+        "score": best_slot.score,
         "status": "scheduled",
         "message": "Interview automatically scheduled at optimal time. Notifications sent."
     }
@@ -380,7 +718,7 @@ def update_interview_status(interview_id: int, status: str, db=Depends(get_db)):
     if status not in ["scheduled", "completed", "cancelled", "rescheduled"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    success = db.update_interview_status(interview_id, status)
+    success = set_interview_status(interview_id, status)
     if not success:
         raise HTTPException(status_code=404, detail="Interview not found")
     
@@ -1,191 +1,771 @@
 import pandas as pd
 import numpy as np
+import heapq
+import threading
+import time
+import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Callable, Iterator, Union
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import OneHotEncoder
 
-class SmartScheduler:
+import availability_bitset
+from slot_model import Slot
+from time_utils import SECONDS_PER_DAY, EPOCH_WEEKDAY
+
+# Availability may be passed as Slot objects or as legacy dicts with ISO strings
+SlotLike = Union[Slot, Dict]
+
+
+class RecruiterHistory:
+    """
+    Hour/weekday histogram of a user's past interviews plus a count of the
+    successful ones. It answers the historical bonus for a slot in O(1)
+    instead of rescanning every past interview.
+    """
+
     def __init__(self):
-        self.model = None
+        self.counts = np.zeros((24, 7), dtype=np.int64)
+        self.hour_totals = np.zeros(24, dtype=np.int64)
+        self.weekday_totals = np.zeros(7, dtype=np.int64)
+        self.success_count = 0
+
+    @classmethod
+    def from_schedules(cls, schedules: List[Dict]) -> 'RecruiterHistory':
+        history = cls()
+        for schedule in schedules:
+            history.add(schedule)
+        return history
+
+    @staticmethod
+    def _parse(schedule: Dict) -> Optional[Tuple[int, int, bool]]:
+        # Accepts scheduler-style entries ('start', 'completed_successfully')
+        # as well as rows from the interviews table ('start_time', 'status').
+        start = schedule.get('start', schedule.get('start_time'))
+        if start is None:
+            return None
+        try:
+            start_time = datetime.fromisoformat(start)
+        except (ValueError, TypeError):
+            return None
+        successful = bool(schedule.get('completed_successfully', schedule.get('status') == 'completed'))
+        return start_time.hour, start_time.weekday(), successful
+
+    def add(self, schedule: Dict, sign: int = 1):
+        parsed = self._parse(schedule)
+        if parsed is None:
+            return
+        hour, weekday, successful = parsed
+        self.counts[hour, weekday] += sign
+        self.hour_totals[hour] += sign
+        self.weekday_totals[weekday] += sign
+        if successful:
+            self.success_count += sign
+
+    def remove(self, schedule: Dict):
+        self.add(schedule, sign=-1)
+
+    def bonus(self, hour: int, weekday: int) -> float:
+        near_hour = self.hour_totals[max(hour - 1, 0):hour + 2].sum()
+        bonus = 5 * near_hour + 3 * self.weekday_totals[weekday] + 2 * self.success_count
+        return float(min(bonus, 25))
+
+    def bonuses(self, hours: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+        # Interviews within one hour of each hour of the day (no wrap-around)
+        padded = np.concatenate(([0], self.hour_totals, [0]))
+        near_hour = padded[:-2] + padded[1:-1] + padded[2:]
+        bonus = 5 * near_hour[hours] + 3 * self.weekday_totals[weekdays] + 2 * self.success_count
+        return np.minimum(bonus, 25).astype(float)
+
+
+class SmartScheduler:
+    def __init__(self, history_ttl_seconds: float = 60):
+        # (model, version, metadata), replaced as a whole so readers never
+        # see one model's version next to another's estimator
+        self._model_state: Tuple = (None, None, {})
+        self._model_lock = threading.Lock()  # Serialises writers; readers never take it
         self.feature_encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
         self.candidate_priority_weights = {
             "high": 3.0, 
             "medium": 2.0, 
             "low": 1.0  
         }
+        # (model, feature names, column name -> index) for the current model
+        self._feature_index = None
+        # user id -> (expires_at, RecruiterHistory). Writes made through this
+        # process update entries in place; the TTL picks up writes made by
+        # other workers or directly in the database.
+        self.history_ttl_seconds = history_ttl_seconds
+        self._histories: Dict = {}
+        self._history_lock = threading.Lock()
+        # Bumped on every recorded write, to spot writes racing a load
+        self._history_writes = 0
         
     def train_model(self, historical_data: List[Dict]):
         if not historical_data or len(historical_data) < 10:
             return False
-            
-        features = []
-        outcomes = []
-        
-        for entry in historical_data:
-            day_of_week = datetime.fromisoformat(entry['slot_start']).weekday()
-            hour_of_day = datetime.fromisoformat(entry['slot_start']).hour
-            interviewer_id = entry['interviewer_id']
-            candidate_level = entry['candidate_level']
-            
-            features.append([day_of_week, hour_of_day, interviewer_id, candidate_level])
-            outcomes.append(1 if entry['completed_successfully'] else 0)
-
-        feature_df = pd.DataFrame(features, columns=['day_of_week', 'hour_of_day', 
-                                                    'interviewer_id', 'candidate_level'])
+
+        frame = pd.DataFrame(historical_data, columns=['slot_start', 'interviewer_id',
+                                                       'candidate_level', 'completed_successfully'])
+        return self.train_model_from_frame(frame)
+
+    def train_model_from_frame(self, frame: pd.DataFrame):
+        """
+        Train from a DataFrame with 'slot_start', 'interviewer_id',
+        'candidate_level' and 'completed_successfully' columns.
+        Timestamps are parsed once, column-wise.
+        """
+        if len(frame) < 10:
+            return False
+
+        slot_start = pd.to_datetime(frame['slot_start'], format='ISO8601')
+        feature_df = pd.DataFrame({
+            'day_of_week': slot_start.dt.weekday.to_numpy(),
+            'hour_of_day': slot_start.dt.hour.to_numpy(),
+            'interviewer_id': frame['interviewer_id'].to_numpy(),
+            'candidate_level': frame['candidate_level'].to_numpy()
+        })
+        outcomes = frame['completed_successfully'].astype(bool).astype(int).to_numpy()
 
         categorical_cols = ['interviewer_id', 'candidate_level']
         feature_df_encoded = pd.get_dummies(feature_df, columns=categorical_cols)
 
-        self.model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
-        self.model.fit(feature_df_encoded, outcomes)
+        model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
+        model.fit(feature_df_encoded, outcomes)
+
+        self.set_model(model, {
+            'trained_at': datetime.now().isoformat(),
+            'n_samples': len(outcomes),
+            'positive_rate': float(np.mean(outcomes)),
+            'sklearn_version': sklearn.__version__,
+        })
         
         return True
+
+    # Model lifecycle
+    @property
+    def model(self):
+        return self._model_state[0]
+
+    @property
+    def model_version(self) -> Optional[int]:
+        return self._model_state[1]
+
+    @property
+    def model_metadata(self) -> Dict:
+        return self._model_state[2]
+
+    def set_model(self, model, metadata: Optional[Dict] = None, version: Optional[int] = None):
+        """
+        Swap in a new model. Requests already running keep the model reference
+        they started with; the next request picks up the new one.
+        """
+        with self._model_lock:
+            self._model_state = (model, version, dict(metadata or {}))
+
+    def save_model(self, store) -> Optional[int]:
+        """Persist the current model to a ModelStore and return its version"""
+        model, _, metadata = self._model_state
+        if model is None:
+            return None
+        version = store.save(model, metadata)
+        # Only tag the model we saved; a newer one may have been swapped in meanwhile
+        with self._model_lock:
+            if self._model_state[0] is model:
+                self._model_state = (model, version, {**metadata, 'version': version})
+        return version
+
+    def load_latest_model(self, store) -> bool:
+        """Load the newest stored model if it is newer than the one in use"""
+        latest = store.latest_version()
+        if latest is None or (self.model_version is not None and latest <= self.model_version):
+            return False
+
+        artifact = store.load(latest)
+        metadata = artifact.get('metadata', {})
+        if metadata.get('sklearn_version') not in (None, sklearn.__version__):
+            logging.warning(f"Model version {latest} was trained with scikit-learn "
+                            f"{metadata['sklearn_version']}, running {sklearn.__version__}")
+
+        self.set_model(artifact['model'], metadata, latest)
+        return True
     
     def find_optimal_slots(self, 
-                          candidate_availability: List[Dict],
-                          recruiter_availability: List[Dict],
+                          candidate_availability: List[SlotLike],
+                          recruiter_availability: List[SlotLike],
                           candidate_info: Dict,
-                          recent_schedules: Optional[List[Dict]] = None) -> List[Dict]:
-
-        overlapping_slots = self._find_overlapping_slots(candidate_availability, recruiter_availability)
+                          recent_schedules: Optional[List[Dict]] = None,
+                          history: Optional[RecruiterHistory] = None,
+                          top_k: Optional[int] = None,
+                          duration_minutes: Optional[int] = None,
+                          granularity_minutes: int = 15) -> List[Slot]:
+        """
+        Return the overlapping slots best first, as scored Slots whose user_id
+        is the recruiter. With ``top_k`` only the k best
+        are returned, selected with a bounded heap; slots whose score cannot
+        beat the current k-th best are never passed to the model.
+        With ``duration_minutes`` the candidates are the start times (every
+        ``granularity_minutes``) at which the whole interview fits inside an
+        overlap, each returned with end = start + duration.
+        """
+        overlapping_slots = self._find_overlapping_slots(candidate_availability, recruiter_availability,
+                                                         duration_minutes or 30)
         
         if not overlapping_slots:
             return []
 
-        scored_slots = self._score_slots(overlapping_slots, candidate_info, recent_schedules)
+        if history is None and recent_schedules:
+            history = RecruiterHistory.from_schedules(recent_schedules)
 
-        return sorted(scored_slots, key=lambda x: x['score'], reverse=True)
+        return self._rank_windows(overlapping_slots, candidate_info, history, top_k,
+                                  duration_minutes, granularity_minutes)
+
+    def find_optimal_slots_from_bitsets(self,
+                                        candidate_bitsets: Dict[int, int],
+                                        recruiter_bitsets: Dict[int, int],
+                                        candidate_info: Dict,
+                                        history: Optional[RecruiterHistory] = None,
+                                        top_k: Optional[int] = None,
+                                        min_duration_minutes: int = 30,
+                                        recruiter_id=None,
+                                        duration_minutes: Optional[int] = None,
+                                        granularity_minutes: int = 15) -> List[Slot]:
+        """
+        Same as find_optimal_slots, but for availability stored as weekly
+        15-minute bitsets (see availability_bitset): the overlap is a bitwise
+        AND and the windows are the runs of set bits.
+        """
+        return self.find_panel_slots_from_bitsets([candidate_bitsets, recruiter_bitsets], candidate_info,
+                                                  history, top_k, min_duration_minutes, recruiter_id,
+                                                  duration_minutes, granularity_minutes)
+
+    def find_panel_slots_from_bitsets(self,
+                                      participant_bitsets: List[Dict[int, int]],
+                                      candidate_info: Dict,
+                                      history: Optional[RecruiterHistory] = None,
+                                      top_k: Optional[int] = None,
+                                      min_duration_minutes: int = 30,
+                                      recruiter_id=None,
+                                      duration_minutes: Optional[int] = None,
+                                      granularity_minutes: int = 15) -> List[Slot]:
+        """Same as find_panel_slots, for participants' availability as bitsets"""
+        if not participant_bitsets:
+            return []
+
+        common = participant_bitsets[0]
+        for bitsets in participant_bitsets[1:]:
+            common = availability_bitset.intersect(common, bitsets)
+        windows = [Slot(start, end, recruiter_id)
+                   for start, end in availability_bitset.windows(common, (duration_minutes or min_duration_minutes) * 60)]
+
+        if not windows:
+            return []
+
+        return self._rank_windows(windows, candidate_info, history, top_k,
+                                  duration_minutes, granularity_minutes)
+
+    def iter_optimal_slots(self,
+                           candidate_availability: List[SlotLike],
+                           recruiter_availability: List[SlotLike],
+                           candidate_info: Dict,
+                           recent_schedules: Optional[List[Dict]] = None,
+                           history: Optional[RecruiterHistory] = None,
+                           duration_minutes: Optional[int] = None,
+                           granularity_minutes: int = 15) -> Iterator[Slot]:
+        """
+        Yield the overlapping slots best first. Model inference runs in small
+        batches and only as far as needed to settle the next slot in order.
+        """
+        overlapping_slots = self._find_overlapping_slots(candidate_availability, recruiter_availability,
+                                                         duration_minutes or 30)
+
+        if not overlapping_slots:
+            return
+
+        if history is None and recent_schedules:
+            history = RecruiterHistory.from_schedules(recent_schedules)
+
+        starts, window_index = self._candidate_starts(overlapping_slots, duration_minutes, granularity_minutes)
+        recruiter_ids = self._recruiter_ids(overlapping_slots)
+        recruiter_ids = [recruiter_ids[w] for w in window_index]
+        for i, score in self._iter_ranked(starts, candidate_info, recruiter_ids, history):
+            yield self._make_slot(overlapping_slots[window_index[i]], starts[i], duration_minutes, score)
+
+    def find_panel_slots(self,
+                         participant_availability: List[List[SlotLike]],
+                         candidate_info: Dict,
+                         history: Optional[RecruiterHistory] = None,
+                         top_k: Optional[int] = None,
+                         min_duration_minutes: int = 30,
+                         duration_minutes: Optional[int] = None,
+                         granularity_minutes: int = 15) -> List[Slot]:
+        """
+        Find and rank the windows in which every participant of a panel
+        (the candidate plus all interviewers) is available.
+        Each common window is scored once, the same way as a pairwise overlap.
+        """
+        windows = self._find_common_windows(participant_availability, duration_minutes or min_duration_minutes)
+
+        if not windows:
+            return []
+
+        return self._rank_windows(windows, candidate_info, history, top_k,
+                                  duration_minutes, granularity_minutes)
+
+    def score_slot_batch(self,
+                         starts: np.ndarray,
+                         ends: np.ndarray,
+                         candidate_info: Dict,
+                         top_n: Optional[int] = None,
+                         recruiter_id=None) -> List[Slot]:
+        """
+        Score candidate slots given as epoch-second arrays and return the best
+        ``top_n`` of them (all of them when ``top_n`` is None) as Slots, best first.
+        Only the returned slots are materialized.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if starts.size == 0:
+            return []
+
+        order, scores = self._ranked_order(starts, candidate_info, [recruiter_id] * len(starts), None, top_n)
+
+        return [Slot(int(starts[i]), int(ends[i]), recruiter_id, float(scores[i])) for i in order]
+
+    def _rank_windows(self,
+                      windows: List[Slot],
+                      candidate_info: Dict,
+                      history: Optional[RecruiterHistory],
+                      top_k: Optional[int],
+                      duration_minutes: Optional[int] = None,
+                      granularity_minutes: int = 15) -> List[Slot]:
+        starts, window_index = self._candidate_starts(windows, duration_minutes, granularity_minutes)
+        recruiter_ids = self._recruiter_ids(windows)
+        if duration_minutes is not None:
+            recruiter_ids = [recruiter_ids[w] for w in window_index]
+
+        order, scores = self._ranked_order(starts, candidate_info, recruiter_ids, history, top_k)
+
+        # Only the returned slots are materialized
+        return [self._make_slot(windows[window_index[i]], starts[i], duration_minutes, scores[i])
+                for i in order]
+
+    def _ranked_order(self,
+                      starts: np.ndarray,
+                      candidate_info: Dict,
+                      recruiter_ids: List,
+                      history: Optional[RecruiterHistory],
+                      top_k: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        if top_k is None:
+            return self._rank_slots(starts, candidate_info, recruiter_ids, history)
+        return self._top_k_slots(starts, candidate_info, recruiter_ids, history, top_k)
+
+    def _candidate_starts(self,
+                          windows: List[Slot],
+                          duration_minutes: Optional[int],
+                          granularity_minutes: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Without a duration each window is one candidate starting at its start.
+        # With one, only start times on the granularity grid that leave room for
+        # the whole interview are generated, straight from the window bounds.
+        window_starts = self._slot_starts(windows)
+        if duration_minutes is None:
+            return window_starts, np.arange(len(windows))
+
+        duration = duration_minutes * 60
+        step = granularity_minutes * 60
+        window_ends = np.fromiter((window.end for window in windows), dtype=np.int64, count=len(windows))
+        first = -(-window_starts // step) * step
+        counts = np.maximum((window_ends - duration - first) // step + 1, 0)
+
+        window_index = np.repeat(np.arange(len(windows)), counts)
+        offsets = np.cumsum(counts) - counts
+        position = np.arange(counts.sum()) - np.repeat(offsets, counts)
+        return first[window_index] + position * step, window_index
+
+    @staticmethod
+    def _make_slot(window: Slot, start: int, duration_minutes: Optional[int], score: float) -> Slot:
+        end = window.end if duration_minutes is None else int(start) + duration_minutes * 60
+        return Slot(int(start), end, window.user_id, float(score))
+
+    @staticmethod
+    def _slot_starts(slots: List[Slot]) -> np.ndarray:
+        return np.fromiter((slot.start for slot in slots), dtype=np.int64, count=len(slots))
+
+    @staticmethod
+    def _recruiter_ids(slots: List[Slot]) -> List:
+        return [slot.user_id for slot in slots]
+
+    def _rank_slots(self,
+                    starts: np.ndarray,
+                    candidate_info: Dict,
+                    recruiter_ids: List,
+                    history: Optional[RecruiterHistory] = None) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self._heuristic_scores(starts, candidate_info, history)
+
+        model = self.model
+        if model is not None:
+            scores = self._blend_model_scores(scores, starts, recruiter_ids, candidate_info, model)
+
+        # Stable descending sort keeps the input order for equal scores
+        order = np.argsort(-scores, kind='stable')
+        return order, scores
+
+    def _top_k_slots(self,
+                     starts: np.ndarray,
+                     candidate_info: Dict,
+                     recruiter_ids: List,
+                     history: Optional[RecruiterHistory],
+                     top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Same ranking as _rank_slots (ties go to the earlier slot), restricted
+        # to the best top_k. Returned scores are only valid for evaluated slots.
+        n = len(starts)
+        k = min(top_k, n)
+        heuristic = self._heuristic_scores(starts, candidate_info, history)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), heuristic
+
+        model = self.model
+        if model is None:
+            return self._select_top_k(heuristic, k), heuristic
+
+        # The blended score is 0.3 * heuristic + 70 * p with p <= 1, so
+        # 0.3 * heuristic + 70 bounds it from above. Walk the slots from the
+        # highest bound down and stop once no remaining slot can enter the heap.
+        upper = 0.3 * heuristic + 70.0
+        order = np.argsort(-upper, kind='stable')
+        scores = np.full(n, np.nan)
+        best = []  # min-heap of (score, -index) holding the k best so far
+        # Chunks double in size so a weak bound costs O(log n) model calls
+        chunk_size = max(4 * k, 64)
+        offset = 0
+
+        while offset < n:
+            chunk = order[offset:offset + chunk_size]
+            offset += chunk_size
+            chunk_size *= 2
+            if len(best) == k:
+                chunk = chunk[upper[chunk] >= best[0][0]]
+                if chunk.size == 0:
+                    break
+
+            scores[chunk] = self._blend_model_scores(heuristic[chunk], starts[chunk],
+                                                     [recruiter_ids[i] for i in chunk],
+                                                     candidate_info, model)
+            for i in chunk:
+                entry = (scores[i], -i)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+        ranked = sorted(best, reverse=True)
+        return np.array([-neg_index for _, neg_index in ranked], dtype=np.int64), scores
+
+    @staticmethod
+    def _select_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        # O(n) selection of the k best, then a stable sort of just those k
+        n = len(scores)
+        if k >= n:
+            return np.argsort(-scores, kind='stable')
+        kth_best = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth_best)
+        ties = np.flatnonzero(scores == kth_best)[:k - len(above)]
+        chosen = np.sort(np.concatenate((above, ties)))
+        return chosen[np.argsort(-scores[chosen], kind='stable')]
+
+    def _iter_ranked(self,
+                     starts: np.ndarray,
+                     candidate_info: Dict,
+                     recruiter_ids: List,
+                     history: Optional[RecruiterHistory],
+                     chunk_size: int = 64) -> Iterator[Tuple[int, float]]:
+        heuristic = self._heuristic_scores(starts, candidate_info, history)
+
+        model = self.model
+        if model is None:
+            for i in np.argsort(-heuristic, kind='stable'):
+                yield int(i), float(heuristic[i])
+            return
+
+        # A scored slot is yielded once it beats the upper bound of every slot
+        # not yet evaluated (see _top_k_slots for the bound).
+        upper = 0.3 * heuristic + 70.0
+        order = np.argsort(-upper, kind='stable')
+        scored = []  # max-heap of (-score, index)
+        position = 0
+
+        while True:
+            if scored and (position >= len(order) or -scored[0][0] > upper[order[position]]):
+                neg_score, i = heapq.heappop(scored)
+                yield i, -neg_score
+                continue
+            if position >= len(order):
+                return
+
+            chunk = order[position:position + chunk_size]
+            position += len(chunk)
+            chunk_size *= 2
+            chunk_scores = self._blend_model_scores(heuristic[chunk], starts[chunk],
+                                                    [recruiter_ids[i] for i in chunk],
+                                                    candidate_info, model)
+            for i, score in zip(chunk, chunk_scores):
+                heapq.heappush(scored, (-float(score), int(i)))
+
+    @staticmethod
+    def _hours_and_weekdays(starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        hours = (starts // 3600) % 24
+        weekdays = (starts // SECONDS_PER_DAY + EPOCH_WEEKDAY) % 7
+        return hours, weekdays
+
+    def _base_scores(self, starts: np.ndarray, candidate_info: Dict) -> np.ndarray:
+        # Hour-of-day and weekday preferences, weighted by candidate priority
+        return self._time_scores(starts) * self._priority_weight(candidate_info)
+
+    def _time_scores(self, starts: np.ndarray) -> np.ndarray:
+        hours, weekdays = self._hours_and_weekdays(starts)
+
+        preferred_hours = ((hours >= 10) & (hours <= 11)) | ((hours >= 14) & (hours <= 16))
+        business_hours = (hours >= 9) & (hours <= 17)
+        scores = np.where(preferred_hours, 30.0, np.where(business_hours, 20.0, 10.0))
+
+        scores += np.where(weekdays <= 4, 20.0, 0.0)
+        scores += np.where((weekdays >= 1) & (weekdays <= 3), 5.0, 0.0)
+        return scores
+
+    def _priority_weight(self, candidate_info: Dict) -> float:
+        candidate_priority = candidate_info.get('priority', 'medium')
+        return self.candidate_priority_weights.get(candidate_priority, 1.0)
+
+    def _heuristic_scores(self,
+                          starts: np.ndarray,
+                          candidate_info: Dict,
+                          history: Optional[RecruiterHistory] = None) -> np.ndarray:
+        # Base scores plus the recruiter's historical bonus
+        scores = self._base_scores(starts, candidate_info)
+        if history is not None:
+            scores = scores + history.bonuses(*self._hours_and_weekdays(starts))
+        return scores
+
+    def _blend_model_scores(self,
+                            scores: np.ndarray,
+                            starts: np.ndarray,
+                            recruiter_ids: List,
+                            candidate_info: Dict,
+                            model=None) -> np.ndarray:
+        ml_scores = self._predict_slot_scores(starts, recruiter_ids, candidate_info, model)
+        return 0.3 * scores + 0.7 * (ml_scores * 100)
     
     def _find_overlapping_slots(self, 
-                               candidate_slots: List[Dict],
-                               recruiter_slots: List[Dict]) -> List[Dict]:
+                               candidate_slots: List[SlotLike],
+                               recruiter_slots: List[SlotLike],
+                               min_duration_minutes: int = 30) -> List[Slot]:
+        # Both sides are parsed once, merged into disjoint sorted intervals and
+        # intersected with a two-pointer sweep: O((n + m) log(n + m)).
+        candidate_intervals = self._merge_intervals(self._parse_intervals(candidate_slots, 'candidate_id'))
+        recruiter_intervals = self._merge_intervals(self._parse_intervals(recruiter_slots, 'recruiter_id'))
+        min_duration = min_duration_minutes * 60
+
         overlapping = []
-        
-        for c_slot in candidate_slots:
-            c_start = datetime.fromisoformat(c_slot['start'])
-            c_end = datetime.fromisoformat(c_slot['end'])
-            
-            for r_slot in recruiter_slots:
-                r_start = datetime.fromisoformat(r_slot['start'])
-                r_end = datetime.fromisoformat(r_slot['end'])
-                
-                overlap_start = max(c_start, r_start)
-                overlap_end = min(c_end, r_end)
-                
-                if overlap_start < overlap_end:
-                    duration = (overlap_end - overlap_start).total_seconds() / 60  
-
-                    if duration >= 30:
-                        overlapping.append({
-                            'start': overlap_start.isoformat(),
-                            'end': overlap_end.isoformat(),
-                            'duration_minutes': duration,
-                            'candidate_id': c_slot.get('candidate_id'),
-                            'recruiter_id': r_slot.get('recruiter_id')
-                        })
+        i, j = 0, 0
+        while i < len(candidate_intervals) and j < len(recruiter_intervals):
+            c_start, c_end, _ = candidate_intervals[i]
+            r_start, r_end, recruiter_id = recruiter_intervals[j]
+
+            overlap_start = max(c_start, r_start)
+            overlap_end = min(c_end, r_end)
+
+            if overlap_start < overlap_end and overlap_end - overlap_start >= min_duration:
+                overlapping.append(Slot(overlap_start, overlap_end, recruiter_id))
+
+            # Advance whichever interval finishes first; the other may still
+            # overlap the next interval on the opposite side.
+            if c_end <= r_end:
+                i += 1
+            else:
+                j += 1
         
         return overlapping
+
+    def _find_common_windows(self,
+                             participant_availability: List[List[SlotLike]],
+                             min_duration_minutes: int = 30) -> List[Slot]:
+        # k-way sweep: every participant's merged intervals become a sorted
+        # stream of (time, +1/-1) events, the k streams are combined with a heap
+        # merge, and a window is open while all k participants are available.
+        # Ends sort before starts at the same instant, so touching intervals of
+        # different participants never produce an empty window.
+        participant_count = len(participant_availability)
+        if participant_count == 0:
+            return []
+
+        event_streams = []
+        for slots in participant_availability:
+            intervals = self._merge_intervals(self._parse_intervals(slots, 'user_id'))
+            if not intervals:
+                return []
+            event_streams.append([event for start, end, _ in intervals
+                                  for event in ((start, 1), (end, -1))])
+
+        min_duration = min_duration_minutes * 60
+        windows = []
+        available = 0
+        window_start = None
+        for instant, delta in heapq.merge(*event_streams):
+            available += delta
+            if available == participant_count:
+                window_start = instant
+            elif window_start is not None:
+                if instant - window_start >= min_duration:
+                    windows.append(Slot(window_start, instant))
+                window_start = None
+
+        return windows
+
+    @staticmethod
+    def _parse_intervals(slots: List[SlotLike], id_key: str) -> List[Tuple[int, int, Optional[int]]]:
+        # Legacy dicts keep their role-specific id key ('candidate_id' or
+        # 'recruiter_id'); Slots carry the owner in user_id.
+        intervals = []
+        for slot in slots:
+            slot = Slot.coerce(slot, id_key)
+            if slot.start < slot.end:
+                intervals.append((slot.start, slot.end, slot.user_id))
+        intervals.sort(key=lambda interval: interval[0])
+        return intervals
+
+    @staticmethod
+    def _merge_intervals(intervals: List[Tuple[int, int, Optional[int]]]) -> List[Tuple[int, int, Optional[int]]]:
+        # Expects intervals sorted by start. Touching or overlapping fragments
+        # (e.g. consecutive 30-minute slots) collapse into one window.
+        merged = []
+        for start, end, owner_id in intervals:
+            if merged and start <= merged[-1][1]:
+                last_start, last_end, last_id = merged[-1]
+                merged[-1] = (last_start, max(last_end, end), last_id)
+            else:
+                merged.append((start, end, owner_id))
+        return merged
     
     def _score_slots(self, 
-                    slots: List[Dict],
+                    slots: List[SlotLike],
                     candidate_info: Dict,
-                    recent_schedules: Optional[List[Dict]] = None) -> List[Dict]:
+                    history: Optional[RecruiterHistory] = None) -> List[Slot]:
 
-        scored_slots = []
-        
-        for slot in slots:
-            score = 0
-            slot_datetime = datetime.fromisoformat(slot['start'])
-            
-            hour = slot_datetime.hour
-            if 10 <= hour <= 11 or 14 <= hour <= 16:  
-                score += 30
-            elif 9 <= hour <= 17: 
-                score += 20
-            else:  
-                score += 10
-
-            day_of_week = slot_datetime.weekday()
-            if 0 <= day_of_week <= 4: 
-                score += 20
-                if 1 <= day_of_week <= 3:
-                    score += 5
-
-            candidate_priority = candidate_info.get('priority', 'medium')
-            priority_weight = self.candidate_priority_weights.get(candidate_priority, 1.0)
-            score *= priority_weight
-
-            if recent_schedules and len(recent_schedules) > 0:
-                historical_bonus = self._calculate_historical_bonus(slot, recent_schedules)
-                score += historical_bonus
-            
-            if self.model is not None:
-                ml_score = self._predict_slot_score(slot, candidate_info)
-                score = 0.3 * score + 0.7 * (ml_score * 100)
-            
-            slot_with_score = slot.copy()
-            slot_with_score['score'] = score
-            scored_slots.append(slot_with_score)
-        
-        return scored_slots
+        if not slots:
+            return []
+
+        slots = [Slot.coerce(slot, 'recruiter_id') for slot in slots]
+        starts = self._slot_starts(slots)
+        scores = self._heuristic_scores(starts, candidate_info, history)
+        model = self.model
+        if model is not None:
+            scores = self._blend_model_scores(scores, starts, self._recruiter_ids(slots), candidate_info, model)
+
+        return [Slot(slot.start, slot.end, slot.user_id, float(score)) for slot, score in zip(slots, scores)]
     
-    def _calculate_historical_bonus(self, slot: Dict, recent_schedules: List[Dict]) -> float:
-        bonus = 0
-        slot_time = datetime.fromisoformat(slot['start'])
-        slot_hour = slot_time.hour
-        slot_day = slot_time.weekday()
-
-        for schedule in recent_schedules:
-            # Check if 'start' key exists in the schedule dictionary
-            if 'start' not in schedule:
-                continue  # Skip this schedule if it doesn't have a 'start' key
-            
-            try:
-                schedule_time = datetime.fromisoformat(schedule['start'])
-                
-                if abs(schedule_time.hour - slot_hour) <= 1:
-                    bonus += 5
-                    
-                if schedule_time.weekday() == slot_day:
-                    bonus += 3
-                    
-                if schedule.get('completed_successfully', False):
-                    bonus += 2
-            except (ValueError, TypeError):
-                # Handle cases where the start time is not in a valid format
-                continue
-        
-        return min(bonus, 25) 
+    def _calculate_historical_bonus(self, slot: SlotLike, history: RecruiterHistory) -> float:
+        hours, weekdays = self._hours_and_weekdays(np.array([Slot.coerce(slot).start]))
+        return history.bonus(int(hours[0]), int(weekdays[0]))
+
+    # Recruiter history cache
+    def get_history(self, user_id, loader: Callable[[], List[Dict]]) -> RecruiterHistory:
+        """
+        Return the cached history for a user, building it with loader() when
+        missing or older than history_ttl_seconds
+        """
+        with self._history_lock:
+            entry = self._histories.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            writes_before = self._history_writes
+
+        # Load outside the lock so cold lookups for different users run in parallel
+        history = RecruiterHistory.from_schedules(loader())
+        with self._history_lock:
+            # A write recorded during the load may be missing from it; keep the
+            # result for this call but reload on the next one
+            fresh = self._history_writes == writes_before
+            expires_at = time.monotonic() + self.history_ttl_seconds if fresh else 0
+            self._histories[user_id] = (expires_at, history)
+        return history
+
+    def record_interview(self, interview: Dict):
+        """Add a newly inserted interview to its participants' cached histories"""
+        with self._history_lock:
+            self._history_writes += 1
+            for user_id in self._participants(interview):
+                entry = self._histories.get(user_id)
+                if entry is not None:
+                    entry[1].add(interview)
+
+    def record_status_change(self, interview: Dict, new_status: str):
+        """Move an interview's success count after its status is updated"""
+        updated = {**interview, 'status': new_status}
+        with self._history_lock:
+            self._history_writes += 1
+            for user_id in self._participants(interview):
+                entry = self._histories.get(user_id)
+                if entry is not None:
+                    entry[1].remove(interview)
+                    entry[1].add(updated)
+
+    @staticmethod
+    def _participants(interview: Dict) -> set:
+        return {interview.get('candidate_id'), interview.get('recruiter_id')} - {None}
         
-    def _predict_slot_score(self, slot: Dict, candidate_info: Dict) -> float:
-        if self.model is None:
-            return 0.5  
-
-        slot_time = datetime.fromisoformat(slot['start'])
-        day_of_week = slot_time.weekday()
-        hour_of_day = slot_time.hour
-        interviewer_id = slot.get('recruiter_id', 'unknown')
+    def _predict_slot_score(self, slot: SlotLike, candidate_info: Dict) -> float:
+        slot = Slot.coerce(slot, 'recruiter_id')
+        starts = np.array([slot.start], dtype=np.int64)
+        return float(self._predict_slot_scores(starts, [slot.user_id], candidate_info)[0])
+
+    def _predict_slot_scores(self,
+                             starts: np.ndarray,
+                             recruiter_ids: List,
+                             candidate_info: Dict,
+                             model=None) -> np.ndarray:
+        # One feature matrix and a single predict_proba call for all slots.
+        # Columns follow pd.get_dummies naming ("interviewer_id_<value>"); values
+        # the model never saw have no column and stay all-zero, and None is
+        # skipped just like get_dummies drops missing values.
+        if model is None:
+            model = self.model
+        if model is None:
+            return np.full(len(starts), 0.5)
+
+        feature_names, column_index = self._get_feature_index(model)
+        features = np.zeros((len(starts), len(feature_names)))
+
+        hours, weekdays = self._hours_and_weekdays(starts)
+        if 'day_of_week' in column_index:
+            features[:, column_index['day_of_week']] = weekdays
+        if 'hour_of_day' in column_index:
+            features[:, column_index['hour_of_day']] = hours
+
+        for row, interviewer_id in enumerate(recruiter_ids):
+            if interviewer_id is None:
+                continue
+            column = column_index.get(f"interviewer_id_{interviewer_id}")
+            if column is not None:
+                features[row, column] = 1
+
         candidate_level = candidate_info.get('level', 'mid')
-        
-        feature_vector = pd.DataFrame({
-            'day_of_week': [day_of_week],
-            'hour_of_day': [hour_of_day],
-            'interviewer_id': [interviewer_id],
-            'candidate_level': [candidate_level]
-        })
-        
-        feature_vector_encoded = pd.get_dummies(feature_vector, 
-                                              columns=['interviewer_id', 'candidate_level'])
-        
-        missing_cols = set(self.model.feature_names_in_) - set(feature_vector_encoded.columns)
-        for col in missing_cols:
-            feature_vector_encoded[col] = 0
-        
-        feature_vector_encoded = feature_vector_encoded[self.model.feature_names_in_]
-        
-        probabilities = self.model.predict_proba(feature_vector_encoded)
-        return probabilities[0][1]
+        if candidate_level is not None:
+            column = column_index.get(f"candidate_level_{candidate_level}")
+            if column is not None:
+                features[:, column] = 1
+
+        feature_frame = pd.DataFrame(features, columns=feature_names)
+        return model.predict_proba(feature_frame)[:, 1]
+
+    def _get_feature_index(self, model) -> Tuple[np.ndarray, Dict[str, int]]:
+        # Rebuilt only when the model object changes
+        cached = self._feature_index
+        if cached is None or cached[0] is not model:
+            feature_names = model.feature_names_in_
+            cached = (model, feature_names, {name: i for i, name in enumerate(feature_names)})
+            self._feature_index = cached
+        return cached[1], cached[2]
 
 if __name__ == "__main__":
     scheduler = SmartScheduler()
@@ -232,4 +812,5 @@ if __name__ == "__main__":
     
     print("Optimal interview slots:")
     for slot in optimal_slots:
+        slot = slot.to_dict()
         print(f"- {slot['start']} to {slot['end']} (Score: {slot['score']:.2f})")
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import re
+import tempfile
+import logging
+from typing import Dict, List, Optional
+
+import joblib
+
+ARTIFACT_PATTERN = re.compile(r"^scheduler_model_v(\d+)\.joblib$")
+
+
+class ModelStore:
+    """
+    Versioned on-disk storage for trained scheduler models.
+    Each version is a single joblib file; every worker process loads its own
+    copy of the model. Only the newest ``keep_versions`` files are kept.
+    """
+
+    def __init__(self, artifact_dir: str = "models", keep_versions: int = 5):
+        self.artifact_dir = artifact_dir
+        self.keep_versions = keep_versions
+        self.logger = logging.getLogger(__name__)
+
+    def _path(self, version: int) -> str:
+        return os.path.join(self.artifact_dir, f"scheduler_model_v{version}.joblib")
+
+    def list_versions(self) -> List[int]:
+        """Return all stored versions in ascending order"""
+        if not os.path.isdir(self.artifact_dir):
+            return []
+        versions = []
+        for name in os.listdir(self.artifact_dir):
+            match = ARTIFACT_PATTERN.match(name)
+            if match:
+                versions.append(int(match.group(1)))
+        return sorted(versions)
+
+    def latest_version(self) -> Optional[int]:
+        """Return the newest stored version, or None if nothing is stored"""
+        versions = self.list_versions()
+        return versions[-1] if versions else None
+
+    def save(self, model, metadata: Optional[Dict] = None) -> int:
+        """
+        Write a new version and return its number.
+        The artifact is written to a temporary file and then hard-linked into
+        place, so readers never see a partial file and two writers can never
+        publish the same version number.
+        """
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.artifact_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            version = (self.latest_version() or 0) + 1
+            artifact = {
+                'model': model,
+                'feature_names': list(getattr(model, 'feature_names_in_', [])),
+                'metadata': dict(metadata or {}),
+            }
+            while True:
+                artifact['metadata']['version'] = version
+                joblib.dump(artifact, tmp_path)
+                try:
+                    os.link(tmp_path, self._path(version))
+                    break
+                except FileExistsError:
+                    version += 1
+        finally:
+            os.remove(tmp_path)
+
+        self.logger.info(f"Saved scheduler model version {version}")
+        self.prune()
+        return version
+
+    def prune(self):
+        """Delete all but the newest keep_versions artifacts (None keeps everything)"""
+        if not self.keep_versions:
+            return
+        for version in self.list_versions()[:-self.keep_versions]:
+            try:
+                os.remove(self._path(version))
+            except FileNotFoundError:
+                pass  # Removed by another worker's prune
+            else:
+                self.logger.info(f"Removed scheduler model version {version}")
+
+    def load(self, version: Optional[int] = None) -> Optional[Dict]:
+        """
+        Load a stored artifact (the latest one by default).
+        Returns a dict with 'model', 'feature_names' and 'metadata', or None.
+        """
+        if version is None:
+            version = self.latest_version()
+        if version is None:
+            return None
+        return joblib.load(self._path(version))
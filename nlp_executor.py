@@ -0,0 +1,248 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from nlp_module import AvailabilityParser
+from parse_cache import ParseCache
+from slot_model import Slot
+
+logger = logging.getLogger(__name__)
+
+# Parser of the current worker process, created once by _init_worker
+_worker_parser: Optional[AvailabilityParser] = None
+
+
+def _init_worker(model_name: str, use_spacy: bool):
+    global _worker_parser
+    _worker_parser = AvailabilityParser(model_name, use_spacy=use_spacy)
+    if use_spacy:
+        # Preload so the first task in each worker does not pay for it
+        try:
+            _worker_parser.nlp
+        except OSError:
+            logger.warning("spaCy model %s could not be preloaded", model_name)
+
+
+def _parse_chunk(texts: List[str], batch_size: int) -> List[List[Tuple[int, int]]]:
+    # Plain tuples pickle smaller than Slot objects
+    return [[(slot.start, slot.end) for slot in slots]
+            for slots in _worker_parser.extract_slots_batch(texts, batch_size)]
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the parse queue is full and new work is rejected"""
+
+
+class NLPExecutor:
+    """
+    Parses availability texts in a pool of worker processes, each holding its
+    own preloaded AvailabilityParser, so parsing never runs on the request
+    threads. Single parses are rejected with ExecutorSaturated once
+    ``max_pending`` tasks are queued or running. Batches are sent in chunks,
+    each chunk is run through nlp.pipe in its worker, and results are yielded
+    as chunks finish. Cached parses are answered in this process without a
+    round trip.
+    """
+
+    def __init__(self,
+                 model_name: str = "en_core_web_sm",
+                 use_spacy: bool = True,
+                 max_workers: Optional[int] = None,
+                 chunk_size: int = 32,
+                 batch_size: int = 64,
+                 cache: Optional[ParseCache] = None,
+                 max_pending: int = 64):
+        self.model_name = model_name
+        self.use_spacy = use_spacy
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.cache = cache
+        self.max_pending = max_pending
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+        # Metrics
+        self._metrics_lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.total_latency_ms = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=_init_worker,
+                        initargs=(self.model_name, self.use_spacy)
+                    )
+        return self._pool
+
+    def submit(self, text: str) -> Future:
+        """
+        Parse one text in the pool. Returns a future resolving to a list of
+        Slots; raises ExecutorSaturated when the queue is full.
+        """
+        reference_date = datetime.now().date()
+        intervals = self.cache.get(text, reference_date) if self.cache is not None else None
+        if intervals is not None:
+            with self._metrics_lock:
+                self.cache_hits += 1
+            future = Future()
+            future.set_result([Slot(start, end) for start, end in intervals])
+            return future
+
+        worker_future = self._submit_chunk([text], reject_when_full=True)
+
+        result = Future()
+
+        def finish(done: Future):
+            try:
+                intervals = done.result()[0]
+            except Exception as e:
+                result.set_exception(e)
+                return
+            if self.cache is not None:
+                self.cache.set(text, intervals, reference_date)
+            result.set_result([Slot(start, end) for start, end in intervals])
+
+        worker_future.add_done_callback(finish)
+        return result
+
+    def parse_batch(self, texts: List[str]) -> Iterator[Tuple[int, Optional[List[Slot]], Optional[str]]]:
+        """
+        Yield (index, slots, error) for every text, in completion order.
+        ``slots`` is None and ``error`` is set when parsing failed.
+        """
+        reference_date = datetime.now().date()
+        pending = []
+        for index, text in enumerate(texts):
+            intervals = self.cache.get(text, reference_date) if self.cache is not None else None
+            if intervals is None:
+                pending.append(index)
+            else:
+                yield index, [Slot(start, end) for start, end in intervals], None
+
+        futures = {}
+        for offset in range(0, len(pending), self.chunk_size):
+            chunk = pending[offset:offset + self.chunk_size]
+            # Batches stream from a request thread, so they wait instead of being rejected
+            futures[self._submit_chunk([texts[index] for index in chunk])] = chunk
+
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                parsed = future.result()
+            except Exception as e:
+                logger.exception("Availability parsing failed for %d texts", len(chunk))
+                for index in chunk:
+                    yield index, None, str(e)
+                continue
+
+            for index, intervals in zip(chunk, parsed):
+                if self.cache is not None:
+                    self.cache.set(texts[index], intervals, reference_date)
+                yield index, [Slot(start, end) for start, end in intervals], None
+
+    def _submit_chunk(self, texts: List[str], reject_when_full: bool = False) -> Future:
+        """
+        Send one chunk to the pool. If a worker dies, the pool is replaced and
+        the chunk is retried once; the returned future fails with
+        BrokenProcessPool only when the retry is lost as well.
+        """
+        submitted_at = time.perf_counter()
+        with self._metrics_lock:
+            if reject_when_full and self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.pending} parse tasks already pending")
+            self.pending += 1
+            self.submitted += 1
+
+        result = Future()
+
+        def finish(parsed=None, error: Optional[BaseException] = None):
+            with self._metrics_lock:
+                self.pending -= 1
+                self.total_latency_ms += (time.perf_counter() - submitted_at) * 1000
+                if error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            if error is None:
+                result.set_result(parsed)
+            else:
+                result.set_exception(error)
+
+        def attempt(retries_left: int):
+            pool = self.pool
+            try:
+                future = pool.submit(_parse_chunk, texts, self.batch_size)
+            except BrokenProcessPool as e:
+                self._discard_pool(pool)
+                if retries_left:
+                    attempt(retries_left - 1)
+                else:
+                    finish(error=e)
+                return
+
+            def done(future: Future):
+                try:
+                    parsed = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died; start a fresh pool and try once more
+                    self._discard_pool(pool)
+                    if retries_left:
+                        attempt(retries_left - 1)
+                    else:
+                        finish(error=e)
+                    return
+                except BaseException as e:
+                    finish(error=e)
+                    return
+                finish(parsed)
+
+            future.add_done_callback(done)
+
+        attempt(1)
+        return result
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool, unless another caller has already replaced it"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.max_workers,
+                "pool_started": self._pool is not None,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cache_hits": self.cache_hits,
+                "avg_latency_ms": round(self.total_latency_ms / finished, 3) if finished else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
@@ -1,12 +1,35 @@
-import spacy
-import dateparser
 from datetime import datetime, timedelta
 import re
-from typing import List, Dict, Tuple, Optional
+import threading
+from typing import List, Dict, Tuple, Optional, Set
+
+from date_resolver import DATE_RE, WEEKDAYS, DateResolver, resolver_for
+from parse_cache import ParseCache
+from recurrence import RecurrenceRule, find_recurrences
+from slot_model import Slot, merge_slots, split_slots
+from time_utils import to_epoch, from_epoch
+
+# What may sit between day phrases that share the times after them
+# ("Tuesdays and Thursdays afternoons", "every Monday, Wednesday 10-12")
+CONNECTOR_RE = re.compile(r"[\s,&/]*(?:(?:and|or)[\s,]*)?", re.IGNORECASE)
+
 
 class AvailabilityParser:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
+    # Only NER is used (DATE entities when the regexes find no date), so the
+    # other components are excluded and never loaded
+    SPACY_EXCLUDE = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+    # Length of the slots returned when expansion is requested
+    SLOT_MINUTES = 30
+
+    def __init__(self, model_name: str = "en_core_web_sm", use_spacy: bool = True,
+                 cache: Optional[ParseCache] = None):
+        # spaCy is loaded on first use, and only texts the regex fast path
+        # cannot date ever reach it
+        self.model_name = model_name
+        self.use_spacy = use_spacy
+        self._nlp = None
+        self._nlp_lock = threading.Lock()
+        self.cache = cache
 
         self.time_patterns = {
             "morning": (9, 12),  
@@ -20,80 +43,187 @@ class AvailabilityParser:
         # Generate 30-minute time slots for each day
         self.day_slots = [(h, m) for h in range(8, 18) for m in (0, 30)]
 
-    def extract_availability(self, text: str) -> List[Dict]:
-        doc = self.nlp(text.lower())
-        
-        dates = self._extract_dates(text)
+    @property
+    def nlp(self):
+        """The trimmed spaCy pipeline, loaded on first access"""
+        if self._nlp is None:
+            with self._nlp_lock:
+                if self._nlp is None:
+                    import spacy
+                    self._nlp = spacy.load(self.model_name, exclude=self.SPACY_EXCLUDE)
+        return self._nlp
+
+    def extract_availability(self, text: str, expand: bool = False) -> List[Dict]:
+        """
+        Parse free text into merged, non-overlapping availability intervals.
+        With ``expand`` the intervals are cut into 30-minute slots instead.
+        """
+        return [{
+            "start": from_epoch(slot.start).isoformat(),
+            "end": from_epoch(slot.end).isoformat(),
+            "source_text": text
+        } for slot in self.extract_slots(text, expand)]
+
+    def extract_slots(self, text: str, expand: bool = False) -> List[Slot]:
+        """Same as extract_availability, but returns compact Slot objects."""
+        return self.extract_slots_batch([text], expand=expand)[0]
+
+    def extract_slots_batch(self, texts: List[str], batch_size: int = 64, expand: bool = False) -> List[List[Slot]]:
+        """
+        Parse many texts at once. Texts that need the spaCy fallback are run
+        through nlp.pipe together instead of one pipeline call each.
+        """
+        # Cache keys use today's date, as relative phrases resolve against it
+        reference_date = datetime.now().date()
+        results: List[Optional[List[Slot]]] = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            intervals = self.cache.get(text, reference_date) if self.cache is not None else None
+            if intervals is None:
+                pending.append(index)
+            else:
+                results[index] = [Slot(start, end) for start, end in intervals]
+
+        docs = {}
+        if self.use_spacy:
+            fallback = [index for index in pending if not self._match_dates(texts[index])]
+            if fallback:
+                docs = dict(zip(fallback, self.nlp.pipe((texts[index] for index in fallback),
+                                                        batch_size=batch_size)))
+
+        for index in pending:
+            slots = self._parse_slots(texts[index], docs.get(index))
+            if self.cache is not None:
+                self.cache.set(texts[index], [(slot.start, slot.end) for slot in slots], reference_date)
+            results[index] = slots
+
+        if expand:
+            return [split_slots(slots, self.SLOT_MINUTES) for slots in results]
+        return results
+
+    def extract_recurring(self, text: str) -> Tuple[List[RecurrenceRule], List[Slot]]:
+        """
+        Weekly rules for the recurring phrases of a text, plus merged slots for
+        one-off dates mentioned alongside them ("Mondays 9-11 am and tomorrow
+        3-5 pm"). Each phrase gets only the times written after it. Both lists
+        are empty when nothing in the text recurs.
+        """
+        recurrences = find_recurrences(text)
+        if not recurrences:
+            return [], []
+
+        # Day phrases in order of appearance: (start, end, weekdays, date match)
+        anchors = [(start, end, weekdays, None) for start, end, weekdays in recurrences]
+        for match in DATE_RE.finditer(text):
+            if not any(start < match.end() and match.start() < end for start, end, _ in recurrences):
+                anchors.append((match.start(), match.end(), None, match))
+        anchors.sort(key=lambda anchor: anchor[0])
+
+        groups = [[anchors[0]]]
+        for anchor in anchors[1:]:
+            if CONNECTOR_RE.fullmatch(text[groups[-1][-1][1]:anchor[0]]):
+                groups[-1].append(anchor)
+            else:
+                groups.append([anchor])
+
+        resolver = self._resolver()
+        rules, one_off = [], []
+        for index, group in enumerate(groups):
+            # Text before the first phrase belongs to it ("10-4 every weekday")
+            segment_start = group[0][0] if index else 0
+            segment_end = groups[index + 1][0][0] if index + 1 < len(groups) else len(text)
+            time_ranges = self._extract_time_ranges(text[segment_start:segment_end])
+
+            recurring = any(weekdays is not None for _, _, weekdays, _ in group)
+            weekdays, dates = set(), []
+            for _, _, anchor_weekdays, match in group:
+                if anchor_weekdays is not None:
+                    weekdays |= anchor_weekdays
+                elif recurring and (match.group("relative") or "").lower() in WEEKDAYS:
+                    # "every Monday and Wednesday"
+                    weekdays.add(WEEKDAYS[match.group("relative").lower()])
+                else:
+                    resolved = resolver.resolve_match(match)
+                    if resolved is not None and resolved not in dates:
+                        dates.append(resolved)
+            rules.extend(self._build_rules(weekdays, time_ranges))
+            one_off.extend(self._build_slots(dates, time_ranges))
+        return rules, merge_slots(one_off)
+
+    @staticmethod
+    def _build_rules(weekdays: Set[int], time_ranges: List[Tuple[float, float]]) -> List[RecurrenceRule]:
+        if not weekdays:
+            return []
+        rules = []
+        for start_hour, end_hour in sorted(time_ranges):
+            start_minute, end_minute = round(start_hour * 60), round(end_hour * 60)
+            if start_minute >= end_minute:
+                continue
+            if rules and start_minute <= rules[-1].end_minute:
+                rules[-1].end_minute = max(rules[-1].end_minute, end_minute)
+            else:
+                rules.append(RecurrenceRule(weekdays, start_minute, end_minute))
+        return rules
+
+    def _parse_slots(self, text: str, doc=None) -> List[Slot]:
+        dates = self._extract_dates(text, doc)
         time_ranges = self._extract_time_ranges(text)
         
         if dates and not time_ranges:
             time_ranges = [self.time_patterns.get("business hours", (9, 17))]
         
+        return self._build_slots(dates, time_ranges)
+
+    @staticmethod
+    def _build_slots(dates: List[datetime], time_ranges: List[Tuple[float, float]]) -> List[Slot]:
         availability = []
         for date in dates:
+            day_start = to_epoch(datetime(date.year, date.month, date.day))
             for start_hour, end_hour in time_ranges:
-                current_time = datetime(
-                    date.year, date.month, date.day, start_hour, 0
-                )
-                end_time = datetime(
-                    date.year, date.month, date.day, end_hour, 0
-                )
-                
-                while current_time < end_time:
-                    slot_end = current_time + timedelta(minutes=30)
-                    if slot_end > end_time:
-                        slot_end = end_time
-                        
-                    availability.append({
-                        "start": current_time.isoformat(),
-                        "end": slot_end.isoformat(),
-                        "source_text": text
-                    })
-                    
-                    current_time = slot_end
+                if start_hour < end_hour:
+                    availability.append(Slot(day_start + round(start_hour * 3600),
+                                             day_start + round(end_hour * 3600)))
         
-        return availability
+        # One interval per stretch of free time, e.g. "morning and lunch" is 9-14
+        return merge_slots(availability)
     
-    def _extract_dates(self, text: str) -> List[datetime]:
-        """Extract dates from text."""
-        dates = []
+    @staticmethod
+    def _resolver() -> DateResolver:
+        # Relative dates resolve against today; the lookup tables are built once per day
+        return resolver_for(datetime.now().date())
 
-        date_patterns = [
-            r"(\d{1,2}(?:st|nd|rd|th)? of [a-zA-Z]+)",
-            r"([a-zA-Z]+ \d{1,2}(?:st|nd|rd|th)?)",
-            r"(\d{1,2}/\d{1,2}/\d{2,4})",
-            r"(\d{1,2}-\d{1,2}-\d{2,4})",
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                parsed_date = dateparser.parse(match)
-                if parsed_date:
-                    dates.append(parsed_date)
+    def _extract_dates(self, text: str, doc=None) -> List[datetime]:
+        """Extract dates from text."""
+        dates = self._match_dates(text)
 
-        relative_dates = [
-            "today", "tomorrow", "day after tomorrow", 
-            "next monday", "next tuesday", "next wednesday", 
-            "next thursday", "next friday", "this week", 
-            "next week"
-        ]
-        
-        for date_expr in relative_dates:
-            if date_expr in text.lower():
-                parsed_date = dateparser.parse(date_expr)
-                if parsed_date:
-                    dates.append(parsed_date)
+        # Fall back to spaCy's DATE entities only when no known pattern matched
+        if not dates and self.use_spacy:
+            dates = self._extract_entity_dates(doc if doc is not None else self.nlp(text))
         
         if not dates:
-            next_day = dateparser.parse("tomorrow")
+            next_day = self._resolver().relative_dates["tomorrow"]
             if next_day.weekday() >= 5:  
                 next_day = next_day + timedelta(days=(7 - next_day.weekday()))
             dates.append(next_day)
             
         return dates
+
+    def _match_dates(self, text: str) -> List[datetime]:
+        """Dates found by the known date patterns and relative phrases."""
+        return self._resolver().find_dates(text)
+    
+    def _extract_entity_dates(self, doc) -> List[datetime]:
+        """Extract dates from the DATE entities spaCy found in a parsed doc."""
+        resolver = self._resolver()
+        dates = []
+        for ent in doc.ents:
+            if ent.label_ == "DATE":
+                parsed_date = resolver.parse(ent.text)
+                if parsed_date:
+                    dates.append(parsed_date)
+        return dates
     
-    def _extract_time_ranges(self, text: str) -> List[Tuple[int, int]]:
+    def _extract_time_ranges(self, text: str) -> List[Tuple[float, float]]:
         time_ranges = []
         
         # Check for time pattern matches
@@ -101,23 +231,18 @@ class AvailabilityParser:
             if pattern in text.lower():
                 time_ranges.append(hours)
         
-        # Extract specific times using regex
-        time_pattern = r"(\d{1,2}(?::\d{2})?\s*(?:am|pm))"
-        times = re.findall(time_pattern, text.lower())
+        # Explicit ranges ("10-4", "1-4 pm", "9 am to 5 pm")
+        resolver = self._resolver()
+        ranges, rest = resolver.find_time_ranges(text)
+        time_ranges.extend(ranges)
+        
+        # Pair up any remaining specific times ("2 pm", "10:30 am")
+        hours = resolver.find_times(rest)
         
-        if len(times) >= 2:
-            hours = []
-            for time_str in times:
-                parsed_time = dateparser.parse(time_str)
-                if parsed_time:
-                    hours.append(parsed_time.hour + parsed_time.minute / 60)
-
-            if hours:
-                hours.sort()
-                for i in range(0, len(hours) - 1, 2):
-                    start_hour = int(hours[i])
-                    end_hour = int(hours[i + 1])
-                    time_ranges.append((start_hour, end_hour))
+        if len(hours) >= 2:
+            hours.sort()
+            for i in range(0, len(hours) - 1, 2):
+                time_ranges.append((hours[i], hours[i + 1]))
 
         if not time_ranges:
             time_ranges.append(self.time_patterns["business hours"])
@@ -0,0 +1,132 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import List, Optional, Tuple
+
+# Parsed availability as (start, end) epoch-second pairs
+ParsedIntervals = List[Tuple[int, int]]
+
+
+class ParseCache:
+    """
+    Memoizes availability parses. Keys are the normalized text plus the
+    reference date, since relative phrases like "tomorrow" change meaning at
+    midnight. The in-process tier is a bounded LRU with a TTL; an optional
+    SQLite file adds a tier shared by every worker process.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+            self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                cache_key TEXT PRIMARY KEY,
+                intervals TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            ''')
+            self._conn.commit()
+            self.purge_expired()
+
+    @staticmethod
+    def make_key(text: str, reference_date: Optional[date] = None) -> str:
+        normalized = re.sub(r"\s+", " ", text.strip().lower())
+        return f"{(reference_date or date.today()).isoformat()}|{normalized}"
+
+    def get(self, text: str, reference_date: Optional[date] = None) -> Optional[ParsedIntervals]:
+        key = self.make_key(text, reference_date)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, intervals = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return intervals
+                del self._entries[key]
+
+            shared = self._get_shared(key, now)
+            if shared is not None:
+                expires_at, intervals = shared
+                self.shared_hits += 1
+                self._store(key, intervals, expires_at)
+                return intervals
+
+            self.misses += 1
+            return None
+
+    def set(self, text: str, intervals: ParsedIntervals, reference_date: Optional[date] = None):
+        key = self.make_key(text, reference_date)
+        intervals = [(int(start), int(end)) for start, end in intervals]
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store(key, intervals, expires_at)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache (cache_key, intervals, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(intervals), expires_at)
+                )
+                self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM parse_cache")
+                self._conn.commit()
+
+    def purge_expired(self):
+        """Drop expired entries from the shared tier"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM parse_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+    def _store(self, key: str, intervals: ParsedIntervals, expires_at: float):
+        # Caller holds the lock
+        self._entries[key] = (expires_at, intervals)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_shared(self, key: str, now: float) -> Optional[Tuple[float, ParsedIntervals]]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT expires_at, intervals FROM parse_cache WHERE cache_key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], [tuple(interval) for interval in json.loads(row[1])]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
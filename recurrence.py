@@ -0,0 +1,108 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from slot_model import Slot
+from time_utils import SECONDS_PER_DAY, EPOCH_WEEKDAY
+
+WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Phrase -> weekdays it repeats on (Monday = 0)
+RECURRING_DAYS = {
+    **{name: {day} for day, name in enumerate(WEEKDAY_NAMES)},
+    "weekday": set(range(5)),
+    "weekend": {5, 6},
+    "day": set(range(7)),
+}
+
+# "every weekday", "each Monday", "Tuesdays", "weekdays", "daily"
+RECURRENCE_RE = re.compile(
+    rf"\b(?:every|each)\s+(?P<every>{'|'.join(RECURRING_DAYS)})s?\b"
+    rf"|\b(?P<plural>{'|'.join(RECURRING_DAYS)})s\b"
+    r"|\b(?P<daily>daily)\b",
+    re.IGNORECASE
+)
+
+
+def find_recurrences(text: str) -> List[Tuple[int, int, Set[int]]]:
+    """(start, end, weekdays) for each recurring phrase in the text"""
+    phrases = []
+    for match in RECURRENCE_RE.finditer(text):
+        if match.group("daily"):
+            phrases.append((match.start(), match.end(), RECURRING_DAYS["day"]))
+            continue
+        # "days" on its own ("some days") is not a recurrence
+        phrase = (match.group("every") or match.group("plural")).lower()
+        if match.group("every") or phrase != "day":
+            phrases.append((match.start(), match.end(), RECURRING_DAYS[phrase]))
+    return phrases
+
+
+class RecurrenceRule:
+    """
+    Weekly availability such as "every weekday 10-4": a set of weekdays and a
+    time-of-day range, optionally bounded by valid_from/valid_until (epoch
+    seconds). Occurrences are generated for a search window on demand and are
+    never stored, so storage is one row per rule.
+    """
+
+    __slots__ = ('weekdays', 'start_minute', 'end_minute', 'valid_from', 'valid_until', 'user_id')
+
+    def __init__(self,
+                 weekdays: Iterable[int],
+                 start_minute: int,
+                 end_minute: int,
+                 valid_from: Optional[int] = None,
+                 valid_until: Optional[int] = None,
+                 user_id: Optional[int] = None):
+        self.weekdays = tuple(sorted(set(weekdays)))
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.valid_from = valid_from
+        self.valid_until = valid_until
+        self.user_id = user_id
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'RecurrenceRule':
+        """Build a rule from an availability_rules row"""
+        return cls(
+            (int(day) for day in row['weekdays'].split(',')),
+            row['start_minute'],
+            row['end_minute'],
+            row['valid_from'],
+            row['valid_until'],
+            row['user_id']
+        )
+
+    def occurrences(self, window_start: int, window_end: int) -> Iterator[Slot]:
+        """Yield the rule's slots that fall in [window_start, window_end), clipped to it"""
+        if self.valid_from is not None:
+            window_start = max(window_start, self.valid_from)
+        if self.valid_until is not None:
+            window_end = min(window_end, self.valid_until)
+
+        day = window_start - window_start % SECONDS_PER_DAY
+        while day < window_end:
+            if (day // SECONDS_PER_DAY + EPOCH_WEEKDAY) % 7 in self.weekdays:
+                start = max(day + self.start_minute * 60, window_start)
+                end = min(day + self.end_minute * 60, window_end)
+                if start < end:
+                    yield Slot(start, end, self.user_id)
+            day += SECONDS_PER_DAY
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly form for API responses"""
+        return {
+            'weekdays': [WEEKDAY_NAMES[day] for day in self.weekdays],
+            'start': f"{self.start_minute // 60:02d}:{self.start_minute % 60:02d}",
+            'end': f"{self.end_minute // 60:02d}:{self.end_minute % 60:02d}",
+            'valid_from': self.valid_from,
+            'valid_until': self.valid_until
+        }
+
+    def __repr__(self) -> str:
+        return f"RecurrenceRule({self.to_dict()})"
+
+
+def expand_rules(rules: Iterable[RecurrenceRule], window_start: int, window_end: int) -> List[Slot]:
+    """All occurrences of the rules inside the search window"""
+    return [slot for rule in rules for slot in rule.occurrences(window_start, window_end)]
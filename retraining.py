@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+import logging
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the leader lock is skipped there
+    fcntl = None
+
+import pandas as pd
+
+from ml_module import SmartScheduler
+
+
+class RetrainingWorker:
+    """
+    Retrains the SmartScheduler model in a background thread from interview
+    outcomes in the interviews table.
+    A retrain runs every ``interval_seconds``, or sooner once
+    ``min_new_outcomes`` status changes have been reported through
+    notify_outcome(), or once the outcomes in the database change when it
+    runs as its own process. The new model is fitted off the request path and
+    then swapped into the scheduler (and written to the ModelStore, if given).
+    With ``lock_path`` only the process holding that file lock retrains, so
+    several API workers never train and publish the same model.
+    """
+
+    OUTCOME_STATUSES = ('completed', 'cancelled')
+    OUTCOME_QUERY = """SELECT start_time AS slot_start,
+                              recruiter_id AS interviewer_id,
+                              status
+                       FROM interviews
+                       WHERE status IN (?, ?)
+                       ORDER BY id"""
+    OUTCOME_FINGERPRINT_QUERY = """SELECT COUNT(*), COALESCE(SUM(status = ?), 0)
+                                   FROM interviews
+                                   WHERE status IN (?, ?)"""
+
+    def __init__(self,
+                 scheduler: SmartScheduler,
+                 db_path: str,
+                 store=None,
+                 interval_seconds: int = 3600,
+                 min_new_outcomes: int = 50,
+                 chunk_size: int = 5000,
+                 candidate_level: str = 'mid',
+                 lock_path: Optional[str] = None):
+        self.scheduler = scheduler
+        self.db_path = db_path
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.min_new_outcomes = min_new_outcomes
+        self.chunk_size = chunk_size
+        # The users table has no level column; use the same default that
+        # scoring falls back to so training and inference features agree.
+        self.candidate_level = candidate_level
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._trained_fingerprint = None
+
+        self.pending_outcomes = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> bool:
+        """
+        Start the background thread. Returns False without starting when
+        another process holds the retraining lock.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        if not self._acquire_leader_lock():
+            self.logger.info("Scheduler retraining runs in another process")
+            return False
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler-retraining", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            # Closing the file releases the lock
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _acquire_leader_lock(self) -> bool:
+        if self.lock_path is None or fcntl is None:
+            return True
+        if self._lock_file is not None:
+            return True
+        lock_dir = os.path.dirname(self.lock_path)
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            # Held until stop() or process exit, so a crashed leader frees it
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def notify_outcome(self, count: int = 1):
+        """Report new completed/cancelled interviews; may trigger an early retrain"""
+        with self._lock:
+            self.pending_outcomes += count
+            if self.pending_outcomes >= self.min_new_outcomes:
+                self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval_seconds)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                if (self.pending_outcomes == 0 and self.scheduler.model is not None
+                        and self._outcome_fingerprint() == self._trained_fingerprint):
+                    continue
+                self.run_once()
+            except Exception as e:
+                self.logger.error(f"Scheduler retraining failed: {str(e)}")
+
+    def run_once(self) -> bool:
+        """Retrain now. Returns True if a new model was published."""
+        with self._lock:
+            self.pending_outcomes = 0
+
+        self._trained_fingerprint = self._outcome_fingerprint()
+        frame = self.load_training_frame()
+        if not self.scheduler.train_model_from_frame(frame):
+            return False
+
+        if self.store is not None:
+            self.scheduler.save_model(self.store)
+        self.logger.info(f"Retrained scheduler model on {len(frame)} interviews")
+        return True
+
+    def _outcome_fingerprint(self) -> Tuple[int, int]:
+        """Counts of outcome rows, to notice status changes made by other processes"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return tuple(conn.execute(
+                self.OUTCOME_FINGERPRINT_QUERY, ('completed',) + self.OUTCOME_STATUSES
+            ).fetchone())
+        finally:
+            conn.close()
+
+    def load_training_frame(self) -> pd.DataFrame:
+        """Stream outcomes from SQLite in chunks and build the training frame"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            chunks = [self._to_training_rows(chunk) for chunk in pd.read_sql_query(
+                self.OUTCOME_QUERY, conn, params=self.OUTCOME_STATUSES, chunksize=self.chunk_size
+            )]
+        finally:
+            conn.close()
+
+        if not chunks:
+            return pd.DataFrame(columns=['slot_start', 'interviewer_id',
+                                         'candidate_level', 'completed_successfully'])
+        return pd.concat(chunks, ignore_index=True)
+
+    def _to_training_rows(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({
+            'slot_start': chunk['slot_start'],
+            'interviewer_id': chunk['interviewer_id'],
+            'candidate_level': self.candidate_level,
+            'completed_successfully': chunk['status'] == 'completed'
+        })
+
+
+if __name__ == "__main__":
+    # One-off retrain (e.g. from cron), or with --loop the retraining service
+    # that runs next to the API workers; both publish to the shared model store
+    import argparse
+    from config import DATABASE_CONFIG, MODEL_CONFIG
+    from model_store import ModelStore
+
+    parser = argparse.ArgumentParser(description="Retrain the scheduler model")
+    parser.add_argument("--loop", action="store_true", help="Keep retraining every RETRAIN_INTERVAL_SECONDS")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    worker = RetrainingWorker(
+        SmartScheduler(),
+        DATABASE_CONFIG['PATH'],
+        ModelStore(MODEL_CONFIG['ARTIFACT_DIR'], MODEL_CONFIG['KEEP_VERSIONS']),
+        interval_seconds=MODEL_CONFIG['RETRAIN_INTERVAL_SECONDS'],
+        chunk_size=MODEL_CONFIG['RETRAIN_CHUNK_SIZE'],
+        lock_path=MODEL_CONFIG['RETRAIN_LOCK_PATH']
+    )
+    if args.loop:
+        if not worker.start():
+            raise SystemExit("Another process is already retraining the scheduler model")
+        try:
+            worker._thread.join()
+        except KeyboardInterrupt:
+            worker.stop()
+    elif worker.run_once():
+        print(f"Published model version {worker.scheduler.model_version}")
+    else:
+        print("Not enough completed or cancelled interviews to train a model")
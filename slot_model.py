@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from time_utils import to_epoch, from_epoch
+
+
+class Slot:
+    """
+    A time slot shared by the parser, the database layer and the scheduler.
+    Times are epoch seconds (see time_utils); ``user_id`` is the owner of an
+    availability slot or the recruiter of a candidate interview slot, and
+    ``score`` is set once the scheduler has ranked the slot.
+    Slots are converted to JSON-friendly dicts only at the API boundary.
+    """
+
+    __slots__ = ('start', 'end', 'user_id', 'score')
+
+    def __init__(self, start: int, end: int, user_id: Optional[int] = None, score: Optional[float] = None):
+        self.start = start
+        self.end = end
+        self.user_id = user_id
+        self.score = score
+
+    @classmethod
+    def from_dict(cls, data: Dict, id_key: str = 'user_id') -> 'Slot':
+        """Build a slot from a dict with ISO (or epoch) 'start'/'end' values"""
+        return cls(_epoch(data['start']), _epoch(data['end']), data.get(id_key))
+
+    @classmethod
+    def coerce(cls, value: Union['Slot', Dict], id_key: str = 'user_id') -> 'Slot':
+        """Accept either a Slot or a legacy slot dict"""
+        return value if isinstance(value, cls) else cls.from_dict(value, id_key)
+
+    @property
+    def duration_minutes(self) -> float:
+        return (self.end - self.start) / 60
+
+    def to_dict(self) -> Dict:
+        """ISO-formatted dict for API responses"""
+        data = {
+            'start': from_epoch(self.start).isoformat(),
+            'end': from_epoch(self.end).isoformat(),
+            'duration_minutes': self.duration_minutes
+        }
+        if self.user_id is not None:
+            data['user_id'] = self.user_id
+        if self.score is not None:
+            data['score'] = self.score
+        return data
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Slot):
+            return NotImplemented
+        return (self.start, self.end, self.user_id, self.score) == (other.start, other.end, other.user_id, other.score)
+
+    def __repr__(self) -> str:
+        return (f"Slot({from_epoch(self.start).isoformat()} - {from_epoch(self.end).isoformat()}, "
+                f"user_id={self.user_id}, score={self.score})")
+
+
+def merge_slots(slots: List[Slot]) -> List[Slot]:
+    """Merge overlapping or touching slots into sorted, disjoint intervals"""
+    merged = []
+    for slot in sorted(slots, key=lambda slot: slot.start):
+        if merged and slot.start <= merged[-1].end:
+            merged[-1].end = max(merged[-1].end, slot.end)
+        else:
+            merged.append(Slot(slot.start, slot.end, slot.user_id))
+    return merged
+
+
+def split_slots(slots: List[Slot], minutes: int = 30) -> List[Slot]:
+    """Cut slots into consecutive pieces of at most ``minutes`` each"""
+    step = minutes * 60
+    pieces = []
+    for slot in slots:
+        for start in range(slot.start, slot.end, step):
+            pieces.append(Slot(start, min(start + step, slot.end), slot.user_id))
+    return pieces
+
+
+def _epoch(value) -> int:
+    return int(value) if isinstance(value, (int, np.integer)) else to_epoch(value)
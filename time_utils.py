@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta, timezone
+from typing import Union
+
+# Times in this project are naive wall-clock values. They are mapped onto an
+# epoch without any timezone conversion so that hour and weekday arithmetic on
+# epoch seconds gives the same answer as on the original datetime. Values
+# that carry a UTC offset are converted to UTC first, so two strings for
+# the same instant always get the same epoch.
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday (weekday() == 3)
+EPOCH_WEEKDAY = 3
+
+
+def to_epoch(value: Union[str, datetime]) -> int:
+    """Convert an ISO string or datetime into epoch seconds"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(seconds: int) -> datetime:
+    """Convert epoch seconds back into a naive datetime"""
+    return EPOCH + timedelta(seconds=int(seconds))